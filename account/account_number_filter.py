@@ -0,0 +1,196 @@
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from account import metrics
+from account.models import Account, LegacyAccountNumberFilter, is_valid_account_number
+
+metrics.register(
+    'account_number_filter.negative',
+    'account_number_filter.positive',
+    'account_number_filter.false_positive',
+)
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    @property
+    def bits(self) -> bytes:
+        return bytes(self._bits)
+
+    @classmethod
+    def from_bits(cls, size: int, hash_count: int, bits: bytes) -> 'BloomFilter':
+        bloom_filter = cls.__new__(cls)
+        bloom_filter.size, bloom_filter.hash_count, bloom_filter._bits = size, hash_count, bytearray(bits)
+        return bloom_filter
+
+
+class AccountNumberFilter:
+    """
+    Answers definite misses of account numbers without a query. The Bloom filter of a worker is rebuilt in the
+    background every `ACCOUNT_NUMBER_FILTER_REBUILD_SECONDS`, and accounts created since are found in the cache.
+    """
+
+    def __init__(self):
+        self._filter = None
+        self._built_at = None
+        self._lock = threading.Lock()
+        self._rebuilding = False
+
+    @property
+    def cache(self):
+        return caches[settings.ACCOUNT_NUMBER_FILTER_CACHE]
+
+    def _cache_key(self, account_number: str) -> str:
+        return f'account_number:{account_number}'
+
+    def rebuild(self):
+        started = time.monotonic()
+        account_numbers = Account.objects.values_list('account_number', flat=True)
+        # Room for the accounts created until the next rebuild.
+        bloom_filter = BloomFilter(
+            capacity=int(account_numbers.count() * 1.1) + 1000,
+            error_rate=settings.ACCOUNT_NUMBER_FILTER_ERROR_RATE,
+        )
+        for account_number in account_numbers.iterator(chunk_size=10000):
+            bloom_filter.add(account_number)
+        with self._lock:
+            self._filter = bloom_filter
+            self._built_at = started
+
+    def _rebuild_in_background(self):
+        try:
+            self.rebuild()
+        finally:
+            connection.close()
+            with self._lock:
+                self._rebuilding = False
+
+    def _schedule_rebuild(self):
+        with self._lock:
+            stale = self._built_at is None or (
+                time.monotonic() - self._built_at > settings.ACCOUNT_NUMBER_FILTER_REBUILD_SECONDS
+            )
+            if not stale or self._rebuilding:
+                return
+            self._rebuilding = True
+        threading.Thread(target=self._rebuild_in_background, name='account-number-filter', daemon=True).start()
+
+    def might_exist(self, account_number: str) -> bool:
+        if not settings.ACCOUNT_NUMBER_FILTER:
+            return True
+        self._schedule_rebuild()
+        bloom_filter = self._filter
+        if bloom_filter is None or account_number in bloom_filter:
+            if bloom_filter is not None:
+                metrics.increment('account_number_filter.positive')
+            return True
+        if self.cache.get(self._cache_key(account_number)):
+            return True
+        metrics.increment('account_number_filter.negative')
+        return False
+
+    def record_miss(self, account_number: str):
+        """Records that a number passed by the filter does not exist."""
+        if settings.ACCOUNT_NUMBER_FILTER and self._filter is not None and account_number in self._filter:
+            metrics.increment('account_number_filter.false_positive')
+
+    def add(self, account_number: str):
+        bloom_filter = self._filter
+        if bloom_filter is not None:
+            bloom_filter.add(account_number)
+        # Other workers only learn about the account from the cache until they rebuild their filters.
+        self.cache.set(
+            self._cache_key(account_number),
+            True,
+            timeout=2 * settings.ACCOUNT_NUMBER_FILTER_REBUILD_SECONDS,
+        )
+
+
+class LegacyAccountNumbers:
+    """
+    Rejects mistyped account numbers without a query. Generated numbers pass the mod-97 check, and the numbers given
+    out before check digits were introduced never grow in number, so they are kept in a Bloom filter built once by
+    `build_legacy_account_number_filter` and loaded by every worker.
+    """
+    # Until the filter is built, every well-formed number is accepted and workers look for the filter this often.
+    reload_seconds = 60
+
+    def __init__(self):
+        self._filter = None
+        self._checked_at = None
+
+    def _load(self) -> BloomFilter | None:
+        now = time.monotonic()
+        if self._filter is None and (self._checked_at is None or now - self._checked_at > self.reload_seconds):
+            self._checked_at = now
+            row = LegacyAccountNumberFilter.objects.order_by('-id').first()
+            if row is not None:
+                self._filter = BloomFilter.from_bits(row.size, row.hash_count, row.bits)
+        return self._filter
+
+    def might_exist(self, account_number: str) -> bool:
+        if is_valid_account_number(account_number):
+            return True
+        bloom_filter = self._load()
+        return bloom_filter is None or account_number in bloom_filter
+
+
+def build_legacy_account_number_filter(error_rate: float) -> int:
+    """Replaces the filter of account numbers without check digits, returns how many numbers it holds."""
+    account_numbers = Account.objects.values_list('account_number', flat=True)
+    # Every account may be a legacy one.
+    bloom_filter = BloomFilter(capacity=account_numbers.count() + 1, error_rate=error_rate)
+    legacy_count = 0
+    for account_number in account_numbers.iterator(chunk_size=10000):
+        if not is_valid_account_number(account_number):
+            bloom_filter.add(account_number)
+            legacy_count += 1
+    with transaction.atomic():
+        LegacyAccountNumberFilter.objects.all().delete()
+        LegacyAccountNumberFilter.objects.create(
+            size=bloom_filter.size,
+            hash_count=bloom_filter.hash_count,
+            bits=bloom_filter.bits,
+        )
+    return legacy_count
+
+
+def false_positive_rate(snapshot: dict) -> float | None:
+    """Share of numbers of missing accounts which were not answered by the filter."""
+    false_positives = snapshot['account_number_filter.false_positive']
+    misses = snapshot['account_number_filter.negative'] + false_positives
+    return false_positives / misses if misses else None
+
+
+account_number_filter = AccountNumberFilter()
+legacy_account_numbers = LegacyAccountNumbers()
+
+
+@receiver(post_save, sender=Account, dispatch_uid='account_number_filter')
+def add_created_account_number(sender, instance, created, **kwargs):
+    if created and settings.ACCOUNT_NUMBER_FILTER:
+        account_number_filter.add(instance.account_number)
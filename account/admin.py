@@ -1,3 +1,90 @@
+import json
+
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from account.models import Account, AccountHistory
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Uses the row estimates of the Postgres planner instead of `COUNT(*)` for large changelists, exact counts are only
+    computed below `ADMIN_EXACT_COUNT_THRESHOLD` rows.
+    """
+
+    def _estimate(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            if not queryset.query.where:
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [
+                    queryset.model._meta.db_table,
+                ])
+                row = cursor.fetchone()
+                # Tables never analyzed have no estimate.
+                return row[0] if row and row[0] >= 0 else None
+            try:
+                sql, params = queryset.order_by().query.sql_with_params()
+            except EmptyResultSet:
+                return 0
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+            return (json.loads(plan) if isinstance(plan, str) else plan)[0]['Plan']['Plan Rows']
+
+    @cached_property
+    def count(self):
+        estimate = self._estimate()
+        if estimate is None or estimate < settings.ADMIN_EXACT_COUNT_THRESHOLD:
+            return super().count
+        return estimate
+
+
+class ReadOnlyModelAdmin(admin.ModelAdmin):
+    """Balances and history are only changed by transfers, the admin is for inspecting them."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Account)
+class AccountAdmin(ReadOnlyModelAdmin):
+    list_display = ('id', 'account_number', 'account_name', 'owner', 'balance', 'creation_date')
+    list_select_related = ('owner',)
+    ordering = ('-id',)
+    raw_id_fields = ('owner',)
+    search_fields = ('account_number__exact',)
+
+    def get_search_results(self, request, queryset, search_term):
+        # An OR spanning the joined user table cannot use either index, so the username is resolved to ids first and
+        # both conditions are served by indexes of the account table.
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        owner_ids = list(User.objects.filter(username=search_term).values_list('id', flat=True))
+        return queryset.filter(Q(account_number=search_term) | Q(owner_id__in=owner_ids)), False
+
 
-# Register your models here.
+@admin.register(AccountHistory)
+class AccountHistoryAdmin(ReadOnlyModelAdmin):
+    list_display = ('id', 'account', 'type', 'amount', 'balance_after_transfer', 'description', 'transaction_date')
+    list_select_related = ('account',)
+    ordering = ('-id',)
+    raw_id_fields = ('account',)
+    search_fields = ('account__account_number__exact',)
@@ -0,0 +1,73 @@
+import datetime
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from account.models import AccountHistory, ArchivedAccountHistory, MonthlyTotal
+
+
+def month_of(transaction_date: datetime.datetime) -> datetime.date:
+    return timezone.localdate(transaction_date).replace(day=1)
+
+
+def add_to_monthly_totals(account_history_records):
+    """Adds transfers to the totals of their months, to be called in the transaction creating them."""
+    totals = defaultdict(lambda: [0.0, 0])
+    for account_history in account_history_records:
+        key = (account_history.account_id, month_of(account_history.transaction_date), account_history.type)
+        totals[key][0] += account_history.amount
+        totals[key][1] += 1
+
+    for (account_id, month, type), (total, count) in sorted(totals.items()):
+        key = {'account_id': account_id, 'month': month, 'type': type}
+        increment = {'total': F('total') + total, 'count': F('count') + count}
+        if MonthlyTotal.objects.filter(**key).update(**increment):
+            continue
+        _, created = MonthlyTotal.objects.get_or_create(**key, defaults={'total': total, 'count': count})
+        if not created:
+            # Created by a concurrent transfer in the meantime.
+            MonthlyTotal.objects.filter(**key).update(**increment)
+
+
+def rollup_monthly_totals(since: datetime.date | None = None) -> int:
+    """
+    Recomputes totals of months starting with `since` from history and the archive, returns rows written. Transfers
+    wait until the totals are replaced, so that none of them is missed.
+    """
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            # Conflicts with the updates of `add_to_monthly_totals`: transfers which have updated totals are committed
+            # and aggregated below, the others add to the recomputed totals once this transaction is committed.
+            with connection.cursor() as cursor:
+                cursor.execute(f'LOCK TABLE {MonthlyTotal._meta.db_table} IN SHARE ROW EXCLUSIVE MODE')
+
+        totals = defaultdict(lambda: [0.0, 0])
+        for model in (ArchivedAccountHistory, AccountHistory):
+            history = model.objects.all()
+            if since is not None:
+                history = history.filter(transaction_date__gte=timezone.make_aware(
+                    datetime.datetime.combine(since, datetime.time()),
+                ))
+            rows = history.annotate(month=TruncMonth('transaction_date')).order_by().values(
+                'account_id', 'month', 'type',
+            ).annotate(total=Sum('amount'), count=Count('id'))
+            for row in rows.iterator():
+                key = (row['account_id'], timezone.localdate(row['month']), row['type'])
+                totals[key][0] += row['total']
+                totals[key][1] += row['count']
+
+        monthly_totals = MonthlyTotal.objects.all()
+        if since is not None:
+            monthly_totals = monthly_totals.filter(month__gte=since)
+        monthly_totals.delete()
+        MonthlyTotal.objects.bulk_create(
+            [
+                MonthlyTotal(account_id=account_id, month=month, type=type, total=total, count=count)
+                for (account_id, month, type), (total, count) in totals.items()
+            ],
+            batch_size=1000,
+        )
+    return len(totals)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AccountConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'account'
+
+    def ready(self):
+        # Connects signal receivers and registers metrics reported by `/metrics/` of every worker.
+        from account import account_number_filter, outbox  # noqa: F401
@@ -0,0 +1,227 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from collections import defaultdict
+
+import psycopg2
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.module_loading import import_string
+
+from account.models import Account
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    def __init__(self, account_id: int, queue_size: int):
+        self.account_id = account_id
+        self.overflowed = False
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=queue_size)
+
+    def put(self, event: dict):
+        try:
+            self._loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The loop of an abandoned stream has already been closed.
+            pass
+
+    def _put(self, event: dict):
+        if self.overflowed:
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A slow consumer must not hold an unbounded backlog, so it is dropped and told to resynchronize.
+            self.overflowed = True
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait({'type': 'overflow'})
+
+    async def get(self, timeout: float) -> dict:
+        return await asyncio.wait_for(self._queue.get(), timeout)
+
+
+class Broker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+
+    def subscribe(self, account_id: int, queue_size: int) -> Subscription:
+        subscription = Subscription(account_id, queue_size)
+        with self._lock:
+            self._subscriptions[account_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.account_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.account_id]
+
+    def publish(self, account_id: int, event: dict):
+        with self._lock:
+            subscriptions = tuple(self._subscriptions.get(account_id, ()))
+        for subscription in subscriptions:
+            subscription.put(event)
+
+    def broadcast(self, event: dict):
+        with self._lock:
+            subscriptions = [subscription for group in self._subscriptions.values() for subscription in group]
+        for subscription in subscriptions:
+            subscription.put(event)
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+
+class LocalEventBackend:
+    def __init__(self, broker: Broker):
+        self.broker = broker
+
+    def start(self):
+        pass
+
+    def send(self, account_id: int, event: dict):
+        self.broker.publish(account_id, event)
+
+
+class PostgresEventBackend(LocalEventBackend):
+    channel = 'account_events'
+    # The listener reconnects after this many seconds, doubled after every failed attempt up to the maximum.
+    reconnect_seconds = 1
+    max_reconnect_seconds = 30
+
+    def __init__(self, broker: Broker):
+        super().__init__(broker)
+        self._listener = None
+        self._listener_lock = threading.Lock()
+
+    def start(self):
+        with self._listener_lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name='account-events-listener', daemon=True)
+                self._listener.start()
+
+    def send(self, account_id: int, event: dict):
+        payload = json.dumps({'account_id': account_id, 'event': event})
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [self.channel, payload])
+
+    def _listen(self):
+        delay = self.reconnect_seconds
+        reconnecting = False
+        while True:
+            try:
+                listener_connection = self._connect()
+            except psycopg2.Error:
+                logger.warning('Cannot listen to account events, retrying in %s s', delay, exc_info=True)
+            else:
+                delay = self.reconnect_seconds
+                if reconnecting:
+                    # Notifications sent while the listener was disconnected are lost, so streams resynchronize.
+                    self.broker.broadcast({'type': 'overflow'})
+                reconnecting = True
+                try:
+                    self._receive(listener_connection)
+                except (psycopg2.Error, OSError):
+                    logger.warning('Lost the account events connection, reconnecting in %s s', delay, exc_info=True)
+                finally:
+                    listener_connection.close()
+            time.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_seconds)
+
+    def _connect(self):
+        db_settings = settings.DATABASES['default']
+        listener_connection = psycopg2.connect(
+            dbname=db_settings['NAME'],
+            user=db_settings['USER'],
+            password=db_settings['PASSWORD'],
+            host=db_settings['HOST'],
+            port=db_settings['PORT'],
+        )
+        listener_connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with listener_connection.cursor() as cursor:
+            cursor.execute(f'LISTEN {self.channel}')
+        return listener_connection
+
+    def _receive(self, listener_connection):
+        while True:
+            if select.select([listener_connection], [], [], 5) == ([], [], []):
+                continue
+            listener_connection.poll()
+            while listener_connection.notifies:
+                notification = json.loads(listener_connection.notifies.pop(0).payload)
+                self.broker.publish(notification['account_id'], notification['event'])
+
+
+broker = Broker()
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> LocalEventBackend:
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = import_string(settings.ACCOUNT_EVENTS_BACKEND)(broker)
+        return _backend
+
+
+def transfer_event(account, account_history_data: dict) -> dict:
+    return {
+        'type': 'transfer',
+        'account_id': account.id,
+        'balance': account.balance,
+        'version': account.version,
+        'history': account_history_data,
+    }
+
+
+def publish_transfer(account, account_history_data: dict):
+    event = transfer_event(account, account_history_data)
+
+    def send_transfer_event():
+        get_backend().send(account.id, event)
+
+    # The transfer is committed already when the event is sent, so a failure is only logged by Django.
+    transaction.on_commit(send_transfer_event, robust=True)
+
+
+def format_event(data: dict, event: str) -> str:
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+
+async def stream_account_events(account_id: int):
+    backend = get_backend()
+    backend.start()
+    subscription = broker.subscribe(account_id, settings.ACCOUNT_EVENTS_QUEUE_SIZE)
+    try:
+        # Subscribing before reading the snapshot guarantees no transfer falls between the two.
+        account = await Account.objects.filter(id=account_id).values('balance', 'version').afirst()
+        if account is None:
+            # The account has been deleted since the view checked it.
+            return
+        yield f'retry: {settings.ACCOUNT_EVENTS_RETRY_MILLISECONDS}\n'
+        yield format_event({'account_id': account_id, **account}, 'balance')
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.ACCOUNT_EVENTS_MAX_STREAM_SECONDS
+        while loop.time() < deadline:
+            try:
+                event = await subscription.get(settings.ACCOUNT_EVENTS_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            yield format_event(event, event['type'])
+            if event['type'] == 'overflow':
+                break
+    finally:
+        broker.unsubscribe(subscription)
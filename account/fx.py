@@ -0,0 +1,95 @@
+import csv
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class UnsupportedCurrency(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class RateTable:
+    """Rates of currencies to the base currency, i.e. the value of one unit of every currency in the base currency."""
+
+    version: tuple
+    rates: dict
+
+    @classmethod
+    def load(cls, path) -> 'RateTable':
+        stat = os.stat(path)
+        rates = {}
+        with open(path, newline='') as file:
+            for row in csv.DictReader(file):
+                try:
+                    currency, rate = row['currency'].strip().upper(), float(row['rate'])
+                except (AttributeError, KeyError, TypeError, ValueError):
+                    raise ValueError(f'Malformed row {row}')
+                if len(currency) != 3 or not rate > 0:
+                    raise ValueError(f'Malformed row {row}')
+                rates[currency] = rate
+        rates[settings.FX_BASE_CURRENCY] = 1.0
+        return cls(version=(stat.st_mtime_ns, stat.st_size), rates=rates)
+
+    def rate(self, from_currency: str, to_currency: str) -> float:
+        try:
+            return self.rates[from_currency] / self.rates[to_currency]
+        except KeyError as error:
+            raise UnsupportedCurrency(error.args[0])
+
+    def convert(self, amount: float, from_currency: str, to_currency: str) -> float:
+        if from_currency == to_currency:
+            return amount
+        return round(amount * self.rate(from_currency, to_currency), 2)
+
+    def convert_many(self, amounts, currencies, to_currency: str) -> list[float]:
+        """Converts amounts in the given currencies, looking every rate up once per batch rather than per amount."""
+        factors = {currency: self.rate(currency, to_currency) for currency in set(currencies)}
+        return [round(amount * factors[currency], 2) for amount, currency in zip(amounts, currencies)]
+
+
+class FXRates:
+    """
+    Rate table of a worker, loaded from `FX_RATES_PATH`. The file is checked for changes at most every
+    `FX_RATES_CHECK_SECONDS` and a changed file replaces the whole table at once, so a transfer never mixes rates of
+    two versions and never queries the database. A file which cannot be loaded keeps the last table, or one with the
+    base currency alone until the first file is loaded.
+    """
+
+    def __init__(self):
+        self._table = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def table(self) -> RateTable:
+        if self._table is None or time.monotonic() - self._checked_at > settings.FX_RATES_CHECK_SECONDS:
+            self._reload()
+        return self._table
+
+    def _reload(self):
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                stat = os.stat(settings.FX_RATES_PATH)
+                if self._table is None or self._table.version != (stat.st_mtime_ns, stat.st_size):
+                    self._table = RateTable.load(settings.FX_RATES_PATH)
+            except (OSError, ValueError, csv.Error) as error:
+                logger.warning('Cannot load exchange rates from %s: %s', settings.FX_RATES_PATH, error)
+                if self._table is None:
+                    self._table = RateTable(version=None, rates={settings.FX_BASE_CURRENCY: 1.0})
+
+    def is_supported(self, currency: str) -> bool:
+        return currency in self.table.rates
+
+    def convert(self, amount: float, from_currency: str, to_currency: str) -> float:
+        return self.table.convert(amount, from_currency, to_currency)
+
+
+fx_rates = FXRates()
@@ -0,0 +1,119 @@
+import datetime
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import QuerySet
+
+from account.models import AccountHistory, AccountHistorySummary, ArchivedAccountHistory
+
+HISTORY_FIELDS = (
+    'id',
+    'account_id',
+    'amount',
+    'balance_after_transfer',
+    'currency',
+    'exchange_rate',
+    'original_amount',
+    'original_currency',
+    'description',
+    'transaction_date',
+    'type',
+)
+
+
+class AccountHistoryTimeline:
+    """
+    History of an account, newest first: the hot table followed by the archive. Archived rows are always older than
+    hot ones, so the archive is only queried for slices reaching past the hot rows.
+    """
+
+    def __init__(self, hot: QuerySet, archived: QuerySet, archived_count: int):
+        self.hot = hot
+        self.archived = archived
+        self.archived_count = archived_count
+        self._hot_count = None
+
+    @property
+    def hot_count(self) -> int:
+        if self._hot_count is None:
+            self._hot_count = self.hot.count()
+        return self._hot_count
+
+    def count(self) -> int:
+        return self.hot_count + self.archived_count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index: slice) -> list:
+        start, stop, _ = index.indices(self.count())
+        records = []
+        if start < self.hot_count:
+            records += self.hot[start:min(stop, self.hot_count)]
+        if stop > self.hot_count:
+            records += self.archived[max(start - self.hot_count, 0):stop - self.hot_count]
+        return records
+
+
+def account_history_timeline(account_id: int) -> AccountHistoryTimeline:
+    summary = AccountHistorySummary.objects.filter(account_id=account_id).values('archived_count').first()
+    return AccountHistoryTimeline(
+        AccountHistory.objects.filter(account_id=account_id).order_by('-transaction_date', '-id'),
+        ArchivedAccountHistory.objects.filter(account_id=account_id).order_by('-transaction_date', '-id'),
+        summary['archived_count'] if summary else 0,
+    )
+
+
+def search_account_history(account_id: int, **filters) -> AccountHistoryTimeline:
+    """Searches history of an account, the archive is only counted if the date range reaches it."""
+    summary = AccountHistorySummary.objects.filter(account_id=account_id).values(
+        'archived_count', 'archived_until',
+    ).first()
+    archived = ArchivedAccountHistory.objects.filter(account_id=account_id).search(**filters)
+    date_from = filters.get('date_from')
+    if summary is None or not summary['archived_count'] or (date_from and date_from > summary['archived_until']):
+        archived_count = 0
+    else:
+        archived_count = archived.count()
+    return AccountHistoryTimeline(
+        AccountHistory.objects.filter(account_id=account_id).search(**filters).order_by('-transaction_date', '-id'),
+        archived.order_by('-transaction_date', '-id'),
+        archived_count,
+    )
+
+
+def archive_batch(older_than: datetime.datetime, batch_size: int) -> int:
+    """Moves up to `batch_size` history rows older than `older_than` to the archive, returns the number moved."""
+    with transaction.atomic():
+        records = list(AccountHistory.objects.select_for_update().filter(
+            transaction_date__lt=older_than,
+        ).order_by('id').values(*HISTORY_FIELDS)[:batch_size])
+        if not records:
+            return 0
+
+        ArchivedAccountHistory.objects.bulk_create([ArchivedAccountHistory(**record) for record in records])
+
+        records_by_account = defaultdict(list)
+        for record in records:
+            records_by_account[record['account_id']].append(record)
+        summaries = AccountHistorySummary.objects.select_for_update().in_bulk(records_by_account)
+        for account_id, account_records in records_by_account.items():
+            summary = summaries.get(account_id) or AccountHistorySummary(account_id=account_id)
+            summary.archived_count += len(account_records)
+            summary.archived_total += sum(
+                record['amount'] if record['type'] == 'I' else -record['amount'] for record in account_records
+            )
+            newest = max(account_records, key=lambda record: (record['transaction_date'], record['id']))
+            if summary.archived_until is None or newest['transaction_date'] >= summary.archived_until:
+                summary.archived_until = newest['transaction_date']
+                summary.last_balance_after_transfer = newest['balance_after_transfer']
+            summaries[account_id] = summary
+        AccountHistorySummary.objects.bulk_create(
+            summaries.values(),
+            update_conflicts=True,
+            unique_fields=['account'],
+            update_fields=['archived_count', 'archived_total', 'archived_until', 'last_balance_after_transfer'],
+        )
+
+        AccountHistory.objects.filter(id__in=[record['id'] for record in records]).delete()
+    return len(records)
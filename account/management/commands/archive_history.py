@@ -0,0 +1,31 @@
+import datetime
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from account.history import archive_batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Moves history older than the hot window to the archive table in batches, keeping per-account summaries. '
+        'Every batch is a transaction of its own, so the command can be interrupted and repeated at any time.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=settings.HISTORY_HOT_DAYS)
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows moved per transaction.')
+
+    def handle(self, *args, **options):
+        older_than = timezone.now() - datetime.timedelta(days=options['older_than_days'])
+        started = time.perf_counter()
+        archived = 0
+        while moved := archive_batch(older_than, options['batch_size']):
+            archived += moved
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {archived} history rows older than {older_than:%Y-%m-%d} in {elapsed:.1f}s'
+        ))
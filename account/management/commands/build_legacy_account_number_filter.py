@@ -0,0 +1,26 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from account.account_number_filter import build_legacy_account_number_filter
+
+
+class Command(BaseCommand):
+    help = (
+        'Builds the Bloom filter of account numbers given out before check digits were introduced, which lets '
+        'transfers to mistyped numbers be rejected without a query. Run it once all workers generate numbers with '
+        'check digits; the set of legacy numbers does not change afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--error-rate', type=float, default=settings.ACCOUNT_NUMBER_FILTER_ERROR_RATE)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        legacy_count = build_legacy_account_number_filter(options['error_rate'])
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Built the filter of {legacy_count} legacy account numbers in {elapsed:.1f}s'
+        ))
@@ -0,0 +1,17 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from banking_account.schema import write_schema
+
+
+class Command(BaseCommand):
+    help = 'Generates the OpenAPI document served at /swagger.json.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', type=Path, default=Path(settings.OPENAPI_SCHEMA_PATH))
+
+    def handle(self, *args, **options):
+        schema = write_schema(options['output'])
+        self.stdout.write(self.style.SUCCESS(f'Written {len(schema)} bytes to {options["output"]}'))
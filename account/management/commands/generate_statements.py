@@ -0,0 +1,227 @@
+import csv
+import datetime
+import gzip
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from heapq import merge
+from itertools import groupby
+from pathlib import Path
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Max, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from account.fx import fx_rates
+from account.models import Account, AccountHistory, ArchivedAccountHistory
+
+STATEMENT_COLUMNS = ('date', 'type', 'description', 'amount', 'balance')
+
+
+def _month_range(month: str) -> tuple[datetime.datetime, datetime.datetime]:
+    first_day = datetime.datetime.strptime(month, '%Y-%m')
+    next_month = (first_day + datetime.timedelta(days=32)).replace(day=1)
+    return timezone.make_aware(first_day), timezone.make_aware(next_month)
+
+
+def _write_statement(path: Path, opening_balance: float, month_start, month_end, records, rate=None) -> int:
+    def convert(amount):
+        return amount if rate is None else round(amount * rate, 2)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(STATEMENT_COLUMNS)
+    writer.writerow((month_start.isoformat(), '', 'Opening balance', '', convert(opening_balance)))
+    closing_balance = opening_balance
+    rows = 0
+    for record in records:
+        writer.writerow((
+            record['transaction_date'].isoformat(),
+            record['type'],
+            record['description'] or '',
+            convert(record['amount']),
+            convert(record['balance_after_transfer']),
+        ))
+        closing_balance = record['balance_after_transfer']
+        rows += 1
+    writer.writerow((month_end.isoformat(), '', 'Closing balance', '', convert(closing_balance)))
+
+    # Statements are renamed into place only once complete, so that a crash never leaves a partial file behind.
+    temporary_path = path.with_suffix('.tmp')
+    with gzip.open(temporary_path, 'wt', newline='') as statement:
+        statement.write(buffer.getvalue())
+    temporary_path.replace(path)
+    return rows
+
+
+def generate_partition(
+        start_id: int,
+        end_id: int,
+        month: str,
+        output_dir: Path,
+        chunk_size: int,
+        database: str,
+        currency: str | None = None,
+) -> tuple[int, int]:
+    """
+    Writes statements of accounts with `start_id <= id < end_id`, in `currency` if given, returns numbers of
+    statements and rows written.
+    """
+    month_start, month_end = _month_range(month)
+    marker = output_dir / '.partitions' / f'{start_id}-{end_id}.done'
+    if marker.exists():
+        return 0, 0
+
+    def last_balance_before_month(model):
+        return model.objects.using(database).filter(
+            account=OuterRef('pk'),
+            transaction_date__lt=month_start,
+        ).order_by('-transaction_date', '-id').values('balance_after_transfer')[:1]
+
+    # Archived history is older than hot history, so it only matters when there is no hot row before the month.
+    accounts = list(Account.objects.using(database).filter(
+        id__gte=start_id,
+        id__lt=end_id,
+        creation_date__lt=month_end.date(),
+    ).annotate(
+        opening_balance=Coalesce(
+            Subquery(last_balance_before_month(AccountHistory)),
+            Subquery(last_balance_before_month(ArchivedAccountHistory)),
+        ),
+    ).values_list('id', 'account_number', 'currency', 'opening_balance').order_by('id'))
+    rates = {}
+    if currency:
+        # Rates are looked up once per currency of the partition, all from the same version of the rate table.
+        rate_table = fx_rates.table
+        rates = {
+            account_currency: rate_table.rate(account_currency, currency)
+            for account_currency in {account_currency for _, _, account_currency, _ in accounts}
+        }
+
+    def month_history(model):
+        return model.objects.using(database).filter(
+            account_id__gte=start_id,
+            account_id__lt=end_id,
+            transaction_date__gte=month_start,
+            transaction_date__lt=month_end,
+        ).order_by('account_id', 'transaction_date', 'id').values(
+            'id', 'account_id', 'amount', 'balance_after_transfer', 'description', 'transaction_date', 'type',
+        ).iterator(chunk_size=chunk_size)
+
+    # A single ordered stream for the whole partition, read through server-side cursors on Postgres. A month may be
+    # split between the archive and the hot table, so both are merged.
+    history = merge(
+        month_history(ArchivedAccountHistory),
+        month_history(AccountHistory),
+        key=lambda record: (record['account_id'], record['transaction_date'], record['id']),
+    )
+    history = groupby(history, key=lambda record: record['account_id'])
+
+    statements = rows = 0
+    history_account_id, records = next(history, (None, ()))
+    for account_id, account_number, account_currency, opening_balance in accounts:
+        while history_account_id is not None and history_account_id < account_id:
+            history_account_id, records = next(history, (None, ()))
+        path = output_dir / f'{account_number}.csv.gz'
+        account_records = records if history_account_id == account_id else ()
+        if not path.exists():
+            rows += _write_statement(
+                path,
+                opening_balance or 0,
+                month_start,
+                month_end,
+                account_records,
+                rates.get(account_currency),
+            )
+            statements += 1
+        if history_account_id == account_id:
+            history_account_id, records = next(history, (None, ()))
+
+    marker.touch()
+    return statements, rows
+
+
+def _initialize_worker():
+    if not apps.ready:
+        django.setup()
+
+
+class Command(BaseCommand):
+    help = (
+        'Writes gzipped CSV statements of a month for every account. Accounts are processed in id ranges by a pool '
+        'of processes, and statements already written are skipped, so an interrupted run can simply be repeated.'
+    )
+
+    def add_arguments(self, parser):
+        previous_month = (timezone.now().date().replace(day=1) - datetime.timedelta(days=1)).strftime('%Y-%m')
+        parser.add_argument('--month', default=previous_month, help='Month in YYYY-MM format, the previous by default.')
+        parser.add_argument('--output-dir', type=Path, default=Path(settings.STATEMENTS_DIR))
+        parser.add_argument('--workers', type=int, default=os.cpu_count())
+        parser.add_argument('--partition-size', type=int, default=1000, help='Number of account ids per partition.')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Rows fetched from the cursor at once.')
+        parser.add_argument('--database', default='default', help='Database alias to read from, e.g. a replica.')
+        parser.add_argument('--currency', help='Currency to convert amounts to, those of accounts by default.')
+
+    def _run(self, partitions, workers):
+        if workers == 1:
+            for partition in partitions:
+                yield generate_partition(*partition)
+            return
+
+        # Connections must not be shared with the forked workers.
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_initialize_worker) as executor:
+            futures = [executor.submit(generate_partition, *partition) for partition in partitions]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def handle(self, *args, **options):
+        try:
+            _month_range(options['month'])
+        except ValueError:
+            raise CommandError('--month must be in YYYY-MM format')
+        currency = options['currency'] and options['currency'].upper()
+        if currency and not fx_rates.is_supported(currency):
+            raise CommandError(f'Unsupported currency {currency}')
+
+        database = options['database']
+        output_dir = options['output_dir'] / options['month']
+        if currency:
+            output_dir = output_dir / currency
+        (output_dir / '.partitions').mkdir(parents=True, exist_ok=True)
+        ids = Account.objects.using(database).aggregate(first=Min('id'), last=Max('id'))
+        if ids['first'] is None:
+            self.stdout.write('There are no accounts')
+            return
+
+        partition_size = options['partition_size']
+        partitions = [
+            (
+                start_id,
+                start_id + partition_size,
+                options['month'],
+                output_dir,
+                options['chunk_size'],
+                database,
+                currency,
+            )
+            for start_id in range(ids['first'], ids['last'] + 1, partition_size)
+        ]
+
+        started = time.perf_counter()
+        statements = rows = 0
+        for partition_statements, partition_rows in self._run(partitions, options['workers']):
+            statements += partition_statements
+            rows += partition_rows
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Written {statements} statements with {rows} rows to {output_dir} in {elapsed:.1f}s '
+            f'({rows / elapsed if elapsed else 0:.0f} rows/s)'
+        ))
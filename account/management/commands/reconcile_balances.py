@@ -0,0 +1,108 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import Case, F, FloatField, Max, Min, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from account.models import Account, AccountHistory, BalanceDiscrepancy
+
+
+def reconcile_partition(start_id: int, end_id: int, database: str, tolerance: float, reconciled_at) -> tuple[int, int]:
+    """
+    Compares balances of accounts with `start_id <= id < end_id` with their history in a single query and stores
+    discrepancies, returns numbers of checked accounts and discrepancies found.
+    """
+    history = AccountHistory.objects.using(database).filter(account=OuterRef('pk'))
+    last_balance_after_transfer = history.order_by('-transaction_date', '-id').values('balance_after_transfer')[:1]
+    history_total = history.order_by().values('account').annotate(
+        total=Sum(Case(When(type='I', then=F('amount')), default=-F('amount'), output_field=FloatField())),
+    ).values('total')
+
+    accounts = Account.objects.using(database).filter(id__gte=start_id, id__lt=end_id)
+    # Archived history is accounted for by the summaries, hot history is always newer than archived.
+    discrepancies = accounts.annotate(
+        history_total=(
+            Coalesce(Subquery(history_total), Value(0.0))
+            + Coalesce(F('history_summary__archived_total'), Value(0.0))
+        ),
+        last_balance_after_transfer=Coalesce(
+            Subquery(last_balance_after_transfer),
+            F('history_summary__last_balance_after_transfer'),
+        ),
+    ).filter(
+        Q(history_total__gt=F('balance') + tolerance)
+        | Q(history_total__lt=F('balance') - tolerance)
+        | Q(last_balance_after_transfer__isnull=False, last_balance_after_transfer__gt=F('balance') + tolerance)
+        | Q(last_balance_after_transfer__isnull=False, last_balance_after_transfer__lt=F('balance') - tolerance)
+    ).values_list('id', 'balance', 'history_total', 'last_balance_after_transfer')
+
+    # Only discrepancies are fetched, checked accounts are counted by the database.
+    checked = accounts.count()
+    discrepancies = BalanceDiscrepancy.objects.bulk_create([
+        BalanceDiscrepancy(
+            account_id=account_id,
+            balance=balance,
+            history_total=total,
+            last_balance_after_transfer=last_balance,
+            reconciled_at=reconciled_at,
+        )
+        for account_id, balance, total, last_balance in discrepancies
+    ])
+    return checked, len(discrepancies)
+
+
+class Command(BaseCommand):
+    help = (
+        'Checks that the balance of every account equals the sum of its history and the balance after its last '
+        'transfer, and stores discrepancies. Accounts are checked in id ranges by a pool of threads, reading from the '
+        'first replica if there is one.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--partition-size', type=int, default=10000, help='Number of account ids per partition.')
+        parser.add_argument('--tolerance', type=float, default=0.005, help='Allowed difference of balances.')
+        parser.add_argument(
+            '--database',
+            default=(settings.REPLICA_DATABASES or ['default'])[0],
+            help='Database alias to read from, the first replica by default.',
+        )
+
+    def _reconcile_partition(self, *args):
+        try:
+            return reconcile_partition(*args)
+        finally:
+            connections.close_all()
+
+    def handle(self, *args, **options):
+        database = options['database']
+        ids = Account.objects.using(database).aggregate(first=Min('id'), last=Max('id'))
+        if ids['first'] is None:
+            self.stdout.write('There are no accounts')
+            return
+
+        reconciled_at = timezone.now()
+        partitions = [
+            (start_id, start_id + options['partition_size'], database, options['tolerance'], reconciled_at)
+            for start_id in range(ids['first'], ids['last'] + 1, options['partition_size'])
+        ]
+
+        started = time.perf_counter()
+        if options['workers'] == 1:
+            results = [reconcile_partition(*partition) for partition in partitions]
+        else:
+            with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+                results = list(executor.map(lambda partition: self._reconcile_partition(*partition), partitions))
+        checked = sum(partition_checked for partition_checked, _ in results)
+        discrepancies = sum(partition_discrepancies for _, partition_discrepancies in results)
+
+        elapsed = time.perf_counter() - started
+        style = self.style.WARNING if discrepancies else self.style.SUCCESS
+        self.stdout.write(style(
+            f'Checked {checked} accounts in {elapsed:.1f}s ({checked / elapsed if elapsed else 0:.0f} accounts/s), '
+            f'found {discrepancies} discrepancies'
+        ))
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from account.outbox import get_sink, relay_batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Publishes transfer events written to the outbox by transfers to the sink set by ACCOUNT_OUTBOX_SINK, in '
+        'batches in id order, and deletes them. Runs until interrupted unless --once is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to wait for new events.')
+        parser.add_argument('--report-interval', type=float, default=60.0, help='Seconds between throughput reports.')
+        parser.add_argument('--once', action='store_true', help='Exit once the outbox is empty.')
+
+    def handle(self, *args, **options):
+        sink = get_sink()
+        relayed = 0
+        started = reported = time.perf_counter()
+        while True:
+            batch = relay_batch(sink, options['batch_size'])
+            relayed += batch
+            now = time.perf_counter()
+            if now - reported >= options['report_interval']:
+                self.stdout.write(f'Relayed {relayed} events ({relayed / (now - started):.0f} events/s)')
+                reported = now
+            if batch:
+                continue
+            if options['once']:
+                break
+            time.sleep(options['poll_interval'])
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Relayed {relayed} events in {elapsed:.1f}s ({relayed / elapsed if elapsed else 0:.0f} events/s)'
+        ))
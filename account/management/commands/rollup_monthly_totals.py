@@ -0,0 +1,31 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from account.analytics import rollup_monthly_totals
+
+
+class Command(BaseCommand):
+    help = (
+        'Recomputes monthly totals of incoming and outgoing transfers from history and the archive. Transfers keep '
+        'totals up to date on their own, so this is only needed to backfill or repair them. Transfers wait while it '
+        'runs, so --since should not go further back than needed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='First month to recompute in YYYY-MM format, all months by default.')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = datetime.datetime.strptime(options['since'], '%Y-%m').date()
+            except ValueError:
+                raise CommandError('--since must be in YYYY-MM format')
+
+        started = time.perf_counter()
+        written = rollup_monthly_totals(since)
+        self.stdout.write(self.style.SUCCESS(
+            f'Written {written} monthly totals in {time.perf_counter() - started:.1f}s'
+        ))
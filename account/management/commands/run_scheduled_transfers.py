@@ -0,0 +1,57 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from account.scheduler import run_due_batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Executes due scheduled transfers in batches on a pool of threads. Batches are claimed with SELECT ... FOR '
+        'UPDATE SKIP LOCKED, so several schedulers can run at once without executing a transfer twice. Runs until '
+        'interrupted unless --once is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--batch-size', type=int, default=500, help='Transfers executed per transaction.')
+        parser.add_argument('--poll-interval', type=float, default=5.0, help='Seconds to wait for due transfers.')
+        parser.add_argument('--once', action='store_true', help='Exit once no transfers are due.')
+
+    def _drain(self, batch_size: int) -> tuple[int, int]:
+        succeeded = failed = 0
+        while True:
+            batch_succeeded, batch_failed = run_due_batch(batch_size)
+            if not batch_succeeded + batch_failed:
+                return succeeded, failed
+            succeeded += batch_succeeded
+            failed += batch_failed
+
+    def _drain_in_thread(self, batch_size: int) -> tuple[int, int]:
+        try:
+            return self._drain(batch_size)
+        finally:
+            connections.close_all()
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.perf_counter()
+            if options['workers'] == 1:
+                results = [self._drain(options['batch_size'])]
+            else:
+                with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+                    results = list(executor.map(self._drain_in_thread, [options['batch_size']] * options['workers']))
+            succeeded = sum(worker_succeeded for worker_succeeded, _ in results)
+            failed = sum(worker_failed for _, worker_failed in results)
+
+            if succeeded + failed:
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f'Executed {succeeded + failed} scheduled transfers ({failed} failed) in {elapsed:.1f}s '
+                    f'({(succeeded + failed) / elapsed:.0f} transfers/s)'
+                )
+            if options['once']:
+                break
+            time.sleep(options['poll_interval'])
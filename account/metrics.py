@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.cache import caches
+
+_names = []
+
+
+def register(*names: str):
+    for name in names:
+        if name not in _names:
+            _names.append(name)
+
+
+def increment(name: str, delta: int = 1):
+    cache = caches[settings.ACCOUNT_METRICS_CACHE]
+    key = f'metrics:{name}'
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        # The counter has been evicted between `add` and `incr`.
+        cache.add(key, delta, timeout=None)
+
+
+def snapshot() -> dict:
+    values = caches[settings.ACCOUNT_METRICS_CACHE].get_many([f'metrics:{name}' for name in _names])
+    return {name: values.get(f'metrics:{name}', 0) for name in _names}
@@ -0,0 +1,38 @@
+# Generated by Django 4.2 on 2026-10-19 13:59
+
+from django.db import migrations, models
+
+
+def create_description_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX history_description_trgm_idx ON account_accounthistory '
+        'USING gin ((UPPER(description::text)) gin_trgm_ops)'
+    )
+
+
+def drop_description_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS history_description_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0007_account_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='accounthistory',
+            index=models.Index(fields=['account', '-transaction_date'], name='history_account_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='accounthistory',
+            index=models.Index(fields=['account', 'amount'], name='history_account_amount_idx'),
+        ),
+        migrations.RunPython(create_description_trigram_index, drop_description_trigram_index),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2 on 2026-10-19 14:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0008_accounthistory_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BalanceDiscrepancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('balance', models.FloatField()),
+                ('history_total', models.FloatField()),
+                ('last_balance_after_transfer', models.FloatField(blank=True, null=True)),
+                ('reconciled_at', models.DateTimeField(db_index=True)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='account.account')),
+            ],
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2 on 2026-10-19 14:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0009_balancediscrepancy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountHistorySummary',
+            fields=[
+                ('account', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='history_summary', serialize=False, to='account.account')),
+                ('archived_count', models.PositiveBigIntegerField(default=0)),
+                ('archived_total', models.FloatField(default=0)),
+                ('archived_until', models.DateTimeField(blank=True, null=True)),
+                ('last_balance_after_transfer', models.FloatField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedAccountHistory',
+            fields=[
+                ('amount', models.FloatField()),
+                ('balance_after_transfer', models.FloatField()),
+                ('description', models.CharField(blank=True, max_length=128, null=True)),
+                ('type', models.CharField(choices=[('I', 'incoming'), ('O', 'outgoing')], max_length=1)),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('transaction_date', models.DateTimeField()),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='account.account')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='archivedaccounthistory',
+            index=models.Index(fields=['account', '-transaction_date'], name='archive_account_date_idx'),
+        ),
+    ]
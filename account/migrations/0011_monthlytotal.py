@@ -0,0 +1,29 @@
+# Generated by Django 4.2 on 2026-10-19 14:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0010_history_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('type', models.CharField(choices=[('I', 'incoming'), ('O', 'outgoing')], max_length=1)),
+                ('total', models.FloatField(default=0)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='account.account')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='monthlytotal',
+            constraint=models.UniqueConstraint(fields=('account', 'month', 'type'), name='monthly_total_account_month_type'),
+        ),
+    ]
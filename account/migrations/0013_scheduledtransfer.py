@@ -0,0 +1,49 @@
+# Generated by Django 4.2 on 2026-10-19 14:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0012_outboxevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduledTransfer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.FloatField()),
+                ('description', models.CharField(blank=True, max_length=128, null=True)),
+                ('type', models.CharField(choices=[('I', 'incoming'), ('O', 'outgoing')], default='O', max_length=1)),
+                ('recurrence', models.CharField(blank=True, choices=[('', 'once'), ('D', 'daily'), ('W', 'weekly'), ('M', 'monthly')], default='', max_length=1)),
+                ('first_run_at', models.DateTimeField()),
+                ('next_run_at', models.DateTimeField()),
+                ('run_count', models.PositiveIntegerField(default=0)),
+                ('active', models.BooleanField(default=True)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='account.account')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ScheduledTransferRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scheduled_for', models.DateTimeField()),
+                ('executed_at', models.DateTimeField(auto_now_add=True)),
+                ('status', models.CharField(choices=[('S', 'succeeded'), ('F', 'failed')], max_length=1)),
+                ('error', models.CharField(blank=True, max_length=128)),
+                ('account_history_id', models.BigIntegerField(blank=True, null=True)),
+                ('scheduled_transfer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='runs', to='account.scheduledtransfer')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='scheduledtransferrun',
+            constraint=models.UniqueConstraint(fields=('scheduled_transfer', 'scheduled_for'), name='scheduled_transfer_run_once'),
+        ),
+        migrations.AddIndex(
+            model_name='scheduledtransfer',
+            index=models.Index(condition=models.Q(('active', True)), fields=['next_run_at'], name='scheduled_transfer_due_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2 on 2026-10-19 14:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0013_scheduledtransfer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='account',
+            name='currency',
+            field=models.CharField(default='PLN', max_length=3),
+        ),
+        migrations.AddField(
+            model_name='accounthistory',
+            name='currency',
+            field=models.CharField(default='PLN', max_length=3),
+        ),
+        migrations.AddField(
+            model_name='accounthistory',
+            name='exchange_rate',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='archivedaccounthistory',
+            name='currency',
+            field=models.CharField(default='PLN', max_length=3),
+        ),
+        migrations.AddField(
+            model_name='archivedaccounthistory',
+            name='exchange_rate',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
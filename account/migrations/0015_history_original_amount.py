@@ -0,0 +1,33 @@
+# Generated by Django 4.2 on 2026-10-19 14:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0014_currency'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='accounthistory',
+            name='original_amount',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='accounthistory',
+            name='original_currency',
+            field=models.CharField(blank=True, max_length=3, null=True),
+        ),
+        migrations.AddField(
+            model_name='archivedaccounthistory',
+            name='original_amount',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='archivedaccounthistory',
+            name='original_currency',
+            field=models.CharField(blank=True, max_length=3, null=True),
+        ),
+    ]
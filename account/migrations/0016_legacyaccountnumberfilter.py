@@ -0,0 +1,23 @@
+# Generated by Django 4.2 on 2026-10-19 14:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0015_history_original_amount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LegacyAccountNumberFilter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('size', models.PositiveBigIntegerField()),
+                ('hash_count', models.PositiveSmallIntegerField()),
+                ('bits', models.BinaryField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -3,20 +3,50 @@ import string
 
 from django.db import models
 
+# Account numbers are Polish NRB numbers: two check digits followed by 24 digits, validated like the IBAN they are
+# part of, with the country code PL converted to digits.
+ACCOUNT_NUMBER_LENGTH = 26
+COUNTRY_CODE_DIGITS = '2521'
+
+
+def account_number_check_digits(bban: str) -> str:
+    return f'{98 - int(bban + COUNTRY_CODE_DIGITS + "00") % 97:02d}'
+
+
+def is_well_formed_account_number(account_number) -> bool:
+    return (
+        isinstance(account_number, str)
+        and len(account_number) == ACCOUNT_NUMBER_LENGTH
+        and account_number.isascii()
+        and account_number.isdigit()
+    )
+
+
+def is_valid_account_number(account_number) -> bool:
+    """
+    Checks the length and check digits of an account number. Only generated numbers are guaranteed to pass, numbers
+    given out before check digits were introduced are random digits and stay valid account numbers.
+    """
+    if not is_well_formed_account_number(account_number):
+        return False
+    return int(account_number[2:] + COUNTRY_CODE_DIGITS + account_number[:2]) % 97 == 1
+
 
 class Account(models.Model):
-    account_number = models.CharField(max_length=26, unique=True)
+    account_number = models.CharField(max_length=ACCOUNT_NUMBER_LENGTH, unique=True)
     account_name = models.CharField(max_length=64)
     balance = models.FloatField(default=0)
     creation_date = models.DateField(auto_now_add=True)
+    currency = models.CharField(max_length=3, default='PLN')
     owner = models.ForeignKey('auth.User', on_delete=models.CASCADE)
+    version = models.PositiveBigIntegerField(default=0)
 
     @staticmethod
     def _generate_account_number():
-        account_numbers = Account.objects.all().values_list('account_number', flat=True)
         while True:
-            account_number = ''.join(random.choices(string.digits, k=26))
-            if account_number not in account_numbers:
+            bban = ''.join(random.choices(string.digits, k=ACCOUNT_NUMBER_LENGTH - 2))
+            account_number = account_number_check_digits(bban) + bban
+            if not Account.objects.filter(account_number=account_number).exists():
                 return account_number
 
     def save(self, *args, **kwargs):
@@ -25,15 +55,162 @@ class Account(models.Model):
         super().save(*args, **kwargs)
 
 
-class AccountHistory(models.Model):
+class LegacyAccountNumberFilter(models.Model):
+    """
+    Bloom filter of the account numbers given out before check digits were introduced, built once by the
+    `build_legacy_account_number_filter` command, see `account.account_number_filter.LegacyAccountNumbers`.
+    """
+    size = models.PositiveBigIntegerField()
+    hash_count = models.PositiveSmallIntegerField()
+    bits = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
+class AccountHistoryQuerySet(models.QuerySet):
+    def search(self, type=None, amount_min=None, amount_max=None, date_from=None, date_to=None, description=None):
+        queryset = self
+        if type is not None:
+            queryset = queryset.filter(type=type)
+        if amount_min is not None:
+            queryset = queryset.filter(amount__gte=amount_min)
+        if amount_max is not None:
+            queryset = queryset.filter(amount__lte=amount_max)
+        if date_from is not None:
+            queryset = queryset.filter(transaction_date__gte=date_from)
+        if date_to is not None:
+            queryset = queryset.filter(transaction_date__lte=date_to)
+        if description is not None:
+            # Served by the trigram index on UPPER(description) created in migration 0008 on Postgres.
+            queryset = queryset.filter(description__icontains=description)
+        return queryset
+
+
+class BaseAccountHistory(models.Model):
     TYPE = (
         ('I', 'incoming'),
         ('O', 'outgoing'),
     )
 
     account = models.ForeignKey('Account', on_delete=models.CASCADE)
+    # Amounts are in the currency of the account, transfers in other currencies also record the amount and currency
+    # they were made in and the rate they were converted by.
     amount = models.FloatField()
     balance_after_transfer = models.FloatField()
+    currency = models.CharField(max_length=3, default='PLN')
+    exchange_rate = models.FloatField(blank=True, null=True)
+    original_amount = models.FloatField(blank=True, null=True)
+    original_currency = models.CharField(blank=True, max_length=3, null=True)
     description = models.CharField(blank=True, max_length=128, null=True)
     transaction_date = models.DateTimeField(auto_now_add=True)
     type = models.CharField(max_length=1, choices=TYPE)
+
+    class Meta:
+        abstract = True
+
+
+class AccountHistory(BaseAccountHistory):
+    objects = AccountHistoryQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['account', '-transaction_date'], name='history_account_date_idx'),
+            models.Index(fields=['account', 'amount'], name='history_account_amount_idx'),
+        ]
+
+
+class ArchivedAccountHistory(BaseAccountHistory):
+    # Rows keep the id they had in the hot table.
+    id = models.BigIntegerField(primary_key=True)
+    transaction_date = models.DateTimeField()
+
+    objects = AccountHistoryQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['account', '-transaction_date'], name='archive_account_date_idx'),
+        ]
+
+
+class AccountHistorySummary(models.Model):
+    account = models.OneToOneField(
+        'Account',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='history_summary',
+    )
+    archived_count = models.PositiveBigIntegerField(default=0)
+    archived_total = models.FloatField(default=0)
+    archived_until = models.DateTimeField(blank=True, null=True)
+    last_balance_after_transfer = models.FloatField(blank=True, null=True)
+
+
+class BalanceDiscrepancy(models.Model):
+    account = models.ForeignKey('Account', on_delete=models.CASCADE)
+    balance = models.FloatField()
+    history_total = models.FloatField()
+    last_balance_after_transfer = models.FloatField(blank=True, null=True)
+    reconciled_at = models.DateTimeField(db_index=True)
+
+
+class MonthlyTotal(models.Model):
+    account = models.ForeignKey('Account', on_delete=models.CASCADE)
+    month = models.DateField()
+    type = models.CharField(max_length=1, choices=BaseAccountHistory.TYPE)
+    total = models.FloatField(default=0)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['account', 'month', 'type'], name='monthly_total_account_month_type'),
+        ]
+
+
+class OutboxEvent(models.Model):
+    topic = models.CharField(max_length=32)
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
+class ScheduledTransfer(models.Model):
+    RECURRENCE = (
+        ('', 'once'),
+        ('D', 'daily'),
+        ('W', 'weekly'),
+        ('M', 'monthly'),
+    )
+
+    account = models.ForeignKey('Account', on_delete=models.CASCADE)
+    amount = models.FloatField()
+    description = models.CharField(blank=True, max_length=128, null=True)
+    type = models.CharField(max_length=1, choices=BaseAccountHistory.TYPE, default='O')
+    recurrence = models.CharField(blank=True, max_length=1, choices=RECURRENCE, default='')
+    first_run_at = models.DateTimeField()
+    next_run_at = models.DateTimeField()
+    run_count = models.PositiveIntegerField(default=0)
+    active = models.BooleanField(default=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['next_run_at'], condition=models.Q(active=True), name='scheduled_transfer_due_idx'),
+        ]
+
+
+class ScheduledTransferRun(models.Model):
+    STATUS = (
+        ('S', 'succeeded'),
+        ('F', 'failed'),
+    )
+
+    scheduled_transfer = models.ForeignKey('ScheduledTransfer', on_delete=models.CASCADE, related_name='runs')
+    scheduled_for = models.DateTimeField()
+    executed_at = models.DateTimeField(auto_now_add=True)
+    status = models.CharField(max_length=1, choices=STATUS)
+    error = models.CharField(blank=True, max_length=128)
+    # Not a foreign key, archived history keeps its ids.
+    account_history_id = models.BigIntegerField(blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            # A run is recorded in the transaction of its transfer, so a transfer cannot be executed twice.
+            models.UniqueConstraint(fields=['scheduled_transfer', 'scheduled_for'], name='scheduled_transfer_run_once'),
+        ]
@@ -0,0 +1,78 @@
+import json
+import os
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from account import metrics
+from account.models import OutboxEvent
+
+metrics.register('outbox.relayed')
+
+
+class MemorySink:
+    def __init__(self):
+        self.events = []
+        self._lock = threading.Lock()
+
+    def publish(self, events: list[dict]):
+        with self._lock:
+            self.events.extend(events)
+
+
+class NDJSONSink:
+    """Appends events to a file, one JSON document per line, and syncs it before the events are deleted."""
+
+    def __init__(self, path=None):
+        self.path = path or settings.ACCOUNT_OUTBOX_NDJSON_PATH
+
+    def publish(self, events: list[dict]):
+        with open(self.path, 'a') as file:
+            file.writelines(json.dumps(event) + '\n' for event in events)
+            file.flush()
+            os.fsync(file.fileno())
+
+
+def get_sink():
+    return import_string(settings.ACCOUNT_OUTBOX_SINK)()
+
+
+def relay_batch(sink, batch_size: int) -> int:
+    """
+    Publishes up to `batch_size` of the oldest outbox events to `sink` and deletes them, returns the number of events
+    relayed. Events are deleted only after the sink accepted them, so they are delivered at least once.
+    """
+    with transaction.atomic():
+        # Concurrent relays wait for each other instead of publishing events out of order.
+        events = list(OutboxEvent.objects.select_for_update().order_by('id').values(
+            'id', 'topic', 'payload', 'created_at',
+        )[:batch_size])
+        if not events:
+            return 0
+
+        sink.publish([
+            {
+                'id': event['id'],
+                'topic': event['topic'],
+                'created_at': event['created_at'].isoformat(),
+                **event['payload'],
+            }
+            for event in events
+        ])
+        # Ids of transactions still in progress may be lower, so the batch is deleted by ids rather than by range.
+        OutboxEvent.objects.filter(id__in=[event['id'] for event in events]).delete()
+
+    metrics.increment('outbox.relayed', len(events))
+    return len(events)
+
+
+def lag_seconds() -> float:
+    """
+    Age of the oldest event waiting to be relayed. It is read from the database rather than reported by the relay,
+    which runs in a process of its own, so it also grows when no relay is running.
+    """
+    created_at = OutboxEvent.objects.order_by('id').values_list('created_at', flat=True).first()
+    return (timezone.now() - created_at).total_seconds() if created_at else 0.0
@@ -0,0 +1,55 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get() and settings.REPLICA_DATABASES:
+            return random.choice(settings.REPLICA_DATABASES)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+
+@contextmanager
+def replica_reads():
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def _pin_cache_key(user) -> str:
+    return f'replica_pin_{user.pk}'
+
+
+def pin_to_primary(user):
+    """Keeps reads of the user on the primary until replicas have caught up with the user's own writes."""
+    caches[settings.REPLICA_PIN_CACHE].set(_pin_cache_key(user), True, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned_to_primary(user) -> bool:
+    return caches[settings.REPLICA_PIN_CACHE].get(_pin_cache_key(user), False)
+
+
+def read_from_replica(view_method):
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        if not settings.REPLICA_DATABASES or is_pinned_to_primary(request.user):
+            return view_method(self, request, *args, **kwargs)
+        with replica_reads():
+            return view_method(self, request, *args, **kwargs)
+
+    return wrapper
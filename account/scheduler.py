@@ -0,0 +1,85 @@
+import calendar
+import datetime
+
+from django.db import transaction
+from django.utils import timezone
+
+from account import metrics
+from account.models import AccountHistory, ScheduledTransfer, ScheduledTransferRun
+from account.transfers import InsufficientFunds, Transfer, apply_transfers
+
+metrics.register('scheduled_transfers.succeeded', 'scheduled_transfers.failed')
+
+
+def add_months(moment: datetime.datetime, months: int) -> datetime.datetime:
+    month_index = moment.month - 1 + months
+    year, month = moment.year + month_index // 12, month_index % 12 + 1
+    return moment.replace(year=year, month=month, day=min(moment.day, calendar.monthrange(year, month)[1]))
+
+
+def next_run_at(scheduled_transfer: ScheduledTransfer) -> datetime.datetime | None:
+    # Occurrences are counted from the first run, so that monthly orders return to their day after short months.
+    runs = scheduled_transfer.run_count
+    if scheduled_transfer.recurrence == 'D':
+        return scheduled_transfer.first_run_at + datetime.timedelta(days=runs)
+    if scheduled_transfer.recurrence == 'W':
+        return scheduled_transfer.first_run_at + datetime.timedelta(weeks=runs)
+    if scheduled_transfer.recurrence == 'M':
+        return add_months(scheduled_transfer.first_run_at, runs)
+    return None
+
+
+def _error_message(error: Exception) -> str:
+    if isinstance(error, InsufficientFunds):
+        return 'You do not have enough funds in your account'
+    return type(error).__name__
+
+
+def run_due_batch(batch_size: int, now: datetime.datetime | None = None) -> tuple[int, int]:
+    """
+    Executes up to `batch_size` due transfers in a single transaction, returns the numbers of succeeded and failed
+    ones. Due transfers locked by other schedulers are skipped, so any number of them can run at once.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        due = list(ScheduledTransfer.objects.select_for_update(skip_locked=True).filter(
+            active=True,
+            next_run_at__lte=now,
+        ).order_by('next_run_at')[:batch_size])
+        if not due:
+            return 0, 0
+
+        results = apply_transfers([
+            Transfer(
+                account_id=scheduled_transfer.account_id,
+                amount=scheduled_transfer.amount,
+                description=scheduled_transfer.description,
+                type=scheduled_transfer.type,
+            )
+            for scheduled_transfer in due
+        ])
+
+        runs = []
+        for scheduled_transfer, result in zip(due, results):
+            succeeded = isinstance(result, AccountHistory)
+            runs.append(ScheduledTransferRun(
+                scheduled_transfer=scheduled_transfer,
+                scheduled_for=scheduled_transfer.next_run_at,
+                status='S' if succeeded else 'F',
+                error='' if succeeded else _error_message(result),
+                account_history_id=result.id if succeeded else None,
+            ))
+            # Missed occurrences are executed one by one in the following batches.
+            scheduled_transfer.run_count += 1
+            following_run_at = next_run_at(scheduled_transfer)
+            if following_run_at is None:
+                scheduled_transfer.active = False
+            else:
+                scheduled_transfer.next_run_at = following_run_at
+        ScheduledTransferRun.objects.bulk_create(runs)
+        ScheduledTransfer.objects.bulk_update(due, ['active', 'next_run_at', 'run_count'])
+
+    succeeded = sum(run.status == 'S' for run in runs)
+    metrics.increment('scheduled_transfers.succeeded', succeeded)
+    metrics.increment('scheduled_transfers.failed', len(runs) - succeeded)
+    return succeeded, len(runs) - succeeded
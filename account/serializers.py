@@ -1,13 +1,27 @@
 from rest_framework import serializers
 
-from account.models import Account, AccountHistory
+from account.fx import fx_rates
+from account.models import Account, AccountHistory, ScheduledTransfer
+
+
+class CurrencyField(serializers.CharField):
+    def __init__(self, **kwargs):
+        super().__init__(max_length=3, min_length=3, **kwargs)
+
+    def to_internal_value(self, data):
+        currency = super().to_internal_value(data).upper()
+        if not fx_rates.is_supported(currency):
+            raise serializers.ValidationError('Unsupported currency')
+        return currency
 
 
 class AccountSerializer(serializers.ModelSerializer):
-    account_number = serializers.IntegerField(read_only=True)
+    account_number = serializers.CharField(read_only=True)
     balance = serializers.FloatField(read_only=True)
     creation_date = serializers.DateField(read_only=True)
+    currency = CurrencyField(required=False)
     owner = serializers.CharField(read_only=True)
+    version = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Account
@@ -24,3 +38,46 @@ class AccountHistorySerializer(serializers.ModelSerializer):
     class Meta:
         model = AccountHistory
         exclude = ('account',)
+
+
+class AccountHistorySearchSerializer(serializers.Serializer):
+    type = serializers.ChoiceField(choices=AccountHistory.TYPE, required=False)
+    amount_min = serializers.FloatField(min_value=0, required=False)
+    amount_max = serializers.FloatField(min_value=0, required=False)
+    date_from = serializers.DateTimeField(required=False)
+    date_to = serializers.DateTimeField(required=False)
+    # Trigram indexes cannot narrow down searches for substrings shorter than three characters.
+    description = serializers.CharField(max_length=128, min_length=3, required=False)
+
+    def validate(self, attrs):
+        if attrs.get('amount_min', 0) > attrs.get('amount_max', float('inf')):
+            raise serializers.ValidationError('amount_min cannot be greater than amount_max')
+        if attrs.get('date_from') and attrs.get('date_to') and attrs['date_from'] > attrs['date_to']:
+            raise serializers.ValidationError('date_from cannot be later than date_to')
+        return attrs
+
+
+class AccountAnalyticsSerializer(serializers.Serializer):
+    months = serializers.IntegerField(min_value=1, max_value=120, default=12)
+    currency = CurrencyField(required=False)
+
+
+class ScheduledTransferSerializer(serializers.ModelSerializer):
+    amount = serializers.FloatField(min_value=0)
+    # Only transfers out of the user's accounts can be scheduled.
+    type = serializers.CharField(read_only=True)
+    next_run_at = serializers.DateTimeField(read_only=True)
+    run_count = serializers.IntegerField(read_only=True)
+    active = serializers.BooleanField(read_only=True)
+
+    class Meta:
+        model = ScheduledTransfer
+        fields = '__all__'
+
+    def validate_account(self, account):
+        if account.owner != self.context['request'].user:
+            raise serializers.ValidationError('Account not found')
+        return account
+
+    def create(self, validated_data):
+        return ScheduledTransfer.objects.create(next_run_at=validated_data['first_run_at'], type='O', **validated_data)
@@ -402,8 +402,12 @@ def test_check_single_income_record_account_history(account_history_record_incom
         {
             'amount': account_history_record_income.amount,
             'balance_after_transfer': account_history_record_income.balance_after_transfer,
+            'currency': 'PLN',
             'description': account_history_record_income.description,
+            'exchange_rate': None,
             'id': account_history_record_income.id,
+            'original_amount': None,
+            'original_currency': None,
             'transaction_date': account_history_record_income.transaction_date.strftime('%Y-%m-%d %H:%M:%S'),
             'type': account_history_record_income.type,
         }
@@ -420,8 +424,12 @@ def test_check_single_expense_record_account_history(account_history_record_expe
         {
             'amount': account_history_record_expense.amount,
             'balance_after_transfer': account_history_record_expense.balance_after_transfer,
+            'currency': 'PLN',
             'description': account_history_record_expense.description,
+            'exchange_rate': None,
             'id': account_history_record_expense.id,
+            'original_amount': None,
+            'original_currency': None,
             'transaction_date': account_history_record_expense.transaction_date.strftime('%Y-%m-%d %H:%M:%S'),
             'type': account_history_record_expense.type,
         }
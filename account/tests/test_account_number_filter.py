@@ -0,0 +1,65 @@
+from unittest.mock import patch
+
+import pytest
+from rest_framework.reverse import reverse
+from rest_framework.status import HTTP_204_NO_CONTENT, HTTP_404_NOT_FOUND
+
+from account import metrics
+from account.account_number_filter import AccountNumberFilter, BloomFilter
+from account.models import Account, account_number_check_digits
+
+
+def account_number(bban: str) -> str:
+    return account_number_check_digits(bban) + bban
+
+
+@pytest.fixture
+def number_filter(settings, user_account):
+    settings.ACCOUNT_NUMBER_FILTER = True
+    number_filter = AccountNumberFilter()
+    number_filter.rebuild()
+    with patch('account.views.account_number_filter', number_filter), \
+            patch('account.account_number_filter.account_number_filter', number_filter):
+        yield number_filter
+
+
+def test_bloom_filter_false_positive_rate():
+    bloom_filter = BloomFilter(capacity=10000, error_rate=0.01)
+    for i in range(10000):
+        bloom_filter.add(account_number(f'{i:024d}'))
+
+    assert all(account_number(f'{i:024d}') in bloom_filter for i in range(10000))
+    false_positives = sum(account_number(f'{i:024d}') in bloom_filter for i in range(10000, 30000))
+    assert false_positives / 20000 < 0.02
+
+
+def test_transfer_to_missing_account_without_query(db, django_assert_num_queries, number_filter, user_client):
+    data = {'account_number': account_number('1' * 24), 'amount': 20.54, 'description': 'Transfer description'}
+
+    with django_assert_num_queries(0):
+        response = user_client.patch(reverse('account-transfer-to-account'), data, format='json')
+
+    assert response.status_code == HTTP_404_NOT_FOUND
+    assert metrics.snapshot()['account_number_filter.negative'] == 1
+
+
+def test_transfer_to_account_created_after_rebuild(db, number_filter, user, user_client):
+    account = Account.objects.create(account_name='New account', owner=user)
+    # Filters of other workers do not know the account until they are rebuilt, but the cache does.
+    number_filter._filter = BloomFilter(capacity=1000, error_rate=0.01)
+    data = {'account_number': account.account_number, 'amount': 20.54, 'description': 'Transfer description'}
+
+    response = user_client.patch(reverse('account-transfer-to-account'), data, format='json')
+
+    assert response.status_code == HTTP_204_NO_CONTENT
+
+
+def test_false_positive_is_reported(db, number_filter, user_client):
+    missing_account_number = account_number('2' * 24)
+    number_filter._filter.add(missing_account_number)
+    data = {'account_number': missing_account_number, 'amount': 20.54, 'description': 'Transfer description'}
+
+    response = user_client.patch(reverse('account-transfer-to-account'), data, format='json')
+
+    assert response.status_code == HTTP_404_NOT_FOUND
+    assert metrics.snapshot()['account_number_filter.false_positive'] == 1
@@ -0,0 +1,87 @@
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from rest_framework.reverse import reverse
+from rest_framework.status import HTTP_201_CREATED, HTTP_204_NO_CONTENT, HTTP_404_NOT_FOUND
+
+from account.account_number_filter import LegacyAccountNumbers
+from account.models import Account, is_valid_account_number
+
+LEGACY_ACCOUNT_NUMBER = '16109010140000071219812874'
+
+
+@pytest.fixture
+def legacy_account_numbers():
+    with patch('account.views.legacy_account_numbers', LegacyAccountNumbers()) as legacy_account_numbers:
+        yield legacy_account_numbers
+
+
+def transfer_to_account(client, account_number):
+    data = {'account_number': account_number, 'amount': 20.54, 'description': 'Transfer description'}
+    return client.patch(reverse('account-transfer-to-account'), data, format='json')
+
+
+@pytest.mark.parametrize('account_number, valid', (
+    ('61109010140000071219812874', True),
+    ('61109010140000071219812875', False),
+    ('16109010140000071219812874', False),
+    ('6110901014000007121981287', False),
+    ('6110901014000007121981287a', False),
+    (61109010140000071219812874, False),
+))
+def test_is_valid_account_number(account_number, valid):
+    assert is_valid_account_number(account_number) == valid
+
+
+def test_created_account_number_is_valid(db, user_client):
+    response = user_client.post(reverse('account-list'), {'account_name': 'Some name'})
+
+    assert response.status_code == HTTP_201_CREATED
+    assert isinstance(response.json()['account_number'], str)
+    assert is_valid_account_number(response.json()['account_number'])
+
+
+def test_transfer_to_malformed_account_number(db, django_assert_num_queries, user_client):
+    with django_assert_num_queries(0):
+        response = transfer_to_account(user_client, '6110901014000007121981287a')
+
+    assert response.status_code == HTTP_404_NOT_FOUND
+
+
+@pytest.mark.parametrize('build_filter', (False, True))
+def test_transfer_to_legacy_account_number(build_filter, db, legacy_account_numbers, user_account, user_client):
+    # Numbers given out before check digits were introduced keep working, whether the filter is built or not.
+    Account.objects.filter(id=user_account.id).update(account_number=LEGACY_ACCOUNT_NUMBER)
+    if build_filter:
+        call_command('build_legacy_account_number_filter')
+
+    response = transfer_to_account(user_client, LEGACY_ACCOUNT_NUMBER)
+
+    assert response.status_code == HTTP_204_NO_CONTENT
+    user_account.refresh_from_db()
+    assert user_account.balance == 20.54
+
+
+def test_transfer_to_mistyped_account_number(
+        db,
+        django_assert_num_queries,
+        legacy_account_numbers,
+        user_account,
+        user_account_2,
+        user_client,
+):
+    Account.objects.filter(id=user_account_2.id).update(account_number=LEGACY_ACCOUNT_NUMBER)
+    call_command('build_legacy_account_number_filter')
+    # Loads the filter.
+    assert legacy_account_numbers.might_exist(LEGACY_ACCOUNT_NUMBER)
+    mistyped_numbers = [
+        user_account.account_number[:-1] + str((int(user_account.account_number[-1]) + 1) % 10),
+        LEGACY_ACCOUNT_NUMBER[:-1] + '5',
+    ]
+
+    for account_number in mistyped_numbers:
+        with django_assert_num_queries(0):
+            response = transfer_to_account(user_client, account_number)
+
+        assert response.status_code == HTTP_404_NOT_FOUND
@@ -0,0 +1,92 @@
+from unittest.mock import patch
+
+import pytest
+from django.contrib.admin import site
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_403_FORBIDDEN
+
+from account.admin import AccountAdmin, EstimatedCountPaginator
+from account.models import Account, AccountHistory
+
+
+@pytest.fixture
+def admin_client(client, db):
+    client.force_login(User.objects.create_superuser('admin'))
+    return client
+
+
+@pytest.mark.parametrize('url_name', ('admin:account_account_changelist', 'admin:account_accounthistory_changelist'))
+def test_changelist_queries_do_not_grow_with_rows(
+        account_history_factory,
+        admin_client,
+        django_assert_max_num_queries,
+        url_name,
+        user_account_2,
+):
+    for amount in range(1, 6):
+        account_history_factory(amount=amount)
+
+    # Session and user, one count and the page with its related rows joined.
+    with django_assert_max_num_queries(4):
+        response = admin_client.get(reverse(url_name))
+
+    assert response.status_code == HTTP_200_OK
+
+
+def test_search_accounts_by_number(admin_client, user_account, user_account_2):
+    response = admin_client.get(reverse('admin:account_account_changelist'), {'q': user_account.account_number})
+
+    assert list(response.context['cl'].result_list) == [user_account]
+
+
+def test_search_accounts_by_owner_username(admin_client, user_2, user_account):
+    account = Account.objects.create(account_name='Account name', owner=user_2)
+
+    response = admin_client.get(reverse('admin:account_account_changelist'), {'q': user_2.username})
+
+    assert list(response.context['cl'].result_list) == [account]
+
+
+def test_search_accounts_does_not_join_users(rf, user, user_account):
+    queryset, may_have_duplicates = AccountAdmin(Account, site).get_search_results(
+        rf.get('/'), Account.objects.all(), user.username,
+    )
+
+    assert 'auth_user' not in str(queryset.query)
+    assert list(queryset) == [user_account]
+    assert not may_have_duplicates
+
+
+def test_search_history_by_account_number(account_history_factory, admin_client, user_account, user_account_2):
+    record = account_history_factory()
+    account_history_factory(account=user_account_2)
+
+    response = admin_client.get(reverse('admin:account_accounthistory_changelist'), {'q': user_account.account_number})
+
+    assert list(response.context['cl'].result_list) == [record]
+
+
+@pytest.mark.parametrize('model', ('account', 'accounthistory'))
+def test_ledger_is_read_only(account_history_factory, admin_client, model):
+    record = account_history_factory()
+    object_id = record.account_id if model == 'account' else record.id
+
+    change_url = reverse(f'admin:account_{model}_change', args=[object_id])
+
+    assert admin_client.get(change_url).status_code == HTTP_200_OK
+    assert admin_client.post(change_url, {'amount': 0}).status_code == HTTP_403_FORBIDDEN
+    assert admin_client.get(reverse(f'admin:account_{model}_add')).status_code == HTTP_403_FORBIDDEN
+    delete_url = reverse(f'admin:account_{model}_delete', args=[object_id])
+    assert admin_client.get(delete_url).status_code == HTTP_403_FORBIDDEN
+    assert AccountHistory.objects.get().amount == record.amount
+
+
+def test_estimated_count(db, user_account, user_account_2):
+    paginator = EstimatedCountPaginator(Account.objects.order_by('id'), 1)
+    with patch.object(EstimatedCountPaginator, '_estimate', return_value=10 ** 8):
+        assert paginator.count == 10 ** 8
+
+    paginator = EstimatedCountPaginator(Account.objects.order_by('id'), 1)
+    with patch.object(EstimatedCountPaginator, '_estimate', return_value=1):
+        assert paginator.count == 2
@@ -0,0 +1,107 @@
+import datetime
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.reverse import reverse
+from rest_framework.status import (
+    HTTP_200_OK,
+    HTTP_204_NO_CONTENT,
+    HTTP_304_NOT_MODIFIED,
+    HTTP_400_BAD_REQUEST,
+    HTTP_404_NOT_FOUND,
+)
+
+from account.models import MonthlyTotal
+
+
+def april(day: int) -> datetime.datetime:
+    return datetime.datetime(2023, 4, day, tzinfo=datetime.timezone.utc)
+
+
+def test_transfers_update_monthly_totals(db, user_account, user_client):
+    transfer_to = reverse('account-transfer-to-account')
+    transfer_from = reverse('account-transfer-from-account', args=[user_account.id])
+    for url, amount, day in ((transfer_to, 100.00, 1), (transfer_to, 50.00, 2), (transfer_from, 30.00, 3)):
+        data = {'account_number': user_account.account_number, 'amount': amount, 'description': 'Transfer'}
+        with patch('django.utils.timezone.now', return_value=april(day)):
+            assert user_client.patch(url, data, format='json').status_code == HTTP_204_NO_CONTENT
+
+    assert set(MonthlyTotal.objects.values_list('month', 'type', 'total', 'count')) == {
+        (datetime.date(2023, 4, 1), 'I', 150.00, 2),
+        (datetime.date(2023, 4, 1), 'O', 30.00, 1),
+    }
+
+
+def test_analytics(account_history_factory, db, django_assert_num_queries, user_account, user_client):
+    for month, amount, transfer_type in ((2, 10.00, 'I'), (4, 100.00, 'I'), (4, 25.00, 'O'), (5, 40.00, 'O')):
+        with patch('django.utils.timezone.now', return_value=april(1).replace(month=month)):
+            account_history_factory(amount=amount, transfer_type=transfer_type)
+    call_command('rollup_monthly_totals')
+    url = reverse('account-analytics', args=[user_account.id])
+
+    with patch('django.utils.timezone.now', return_value=april(20).replace(month=5)), django_assert_num_queries(2):
+        response = user_client.get(url, {'months': 3})
+
+    assert response.status_code == HTTP_200_OK
+    assert response.json() == {'currency': 'PLN', 'months': [
+        {'month': '2023-04', 'incoming': 100.00, 'incoming_count': 1, 'outgoing': 25.00, 'outgoing_count': 1},
+        {'month': '2023-05', 'incoming': 0, 'incoming_count': 0, 'outgoing': 40.00, 'outgoing_count': 1},
+    ]}
+
+
+def test_analytics_etag(account_history_factory, db, user_account, user_client):
+    with patch('django.utils.timezone.now', return_value=april(10)):
+        account_history_factory(amount=10.00)
+    call_command('rollup_monthly_totals')
+    url = reverse('account-analytics', args=[user_account.id])
+
+    with patch('django.utils.timezone.now', return_value=april(20)):
+        etag = user_client.get(url)['ETag']
+        assert user_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == HTTP_304_NOT_MODIFIED
+        assert user_client.get(url, {'months': 3}, HTTP_IF_NONE_MATCH=etag).status_code == HTTP_200_OK
+
+    # A new month moves the window.
+    with patch('django.utils.timezone.now', return_value=april(20).replace(month=5)):
+        assert user_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == HTTP_200_OK
+
+    # A backfill changes totals without a transfer.
+    MonthlyTotal.objects.update(total=20.00)
+    with patch('django.utils.timezone.now', return_value=april(20)):
+        assert user_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == HTTP_200_OK
+
+
+def test_rollup_includes_archive(account_history_factory, db, user_account):
+    with patch('django.utils.timezone.now', return_value=april(15).replace(year=2020)):
+        account_history_factory(amount=10.00)
+    call_command('archive_history', older_than_days=365)
+    call_command('rollup_monthly_totals', since='2020-01')
+
+    assert MonthlyTotal.objects.get().total == 10.00
+
+
+def test_rollup_locks_totals_before_reading_history(account_history_factory, db, user_account):
+    if connection.vendor != 'postgresql':
+        pytest.skip('Table locks are only taken on PostgreSQL')
+    account_history_factory(amount=10.00)
+
+    with CaptureQueriesContext(connection) as context:
+        call_command('rollup_monthly_totals')
+
+    statements = [query['sql'] for query in context.captured_queries]
+    lock = next(index for index, sql in enumerate(statements) if sql.startswith('LOCK TABLE account_monthlytotal'))
+    assert all(lock < index for index, sql in enumerate(statements) if 'account_accounthistory' in sql)
+
+
+def test_analytics_invalid_months(db, user_account, user_client):
+    response = user_client.get(reverse('account-analytics', args=[user_account.id]), {'months': 0})
+
+    assert response.status_code == HTTP_400_BAD_REQUEST
+
+
+def test_analytics_as_not_owner(db, user_2_client, user_account):
+    response = user_2_client.get(reverse('account-analytics', args=[user_account.id]))
+
+    assert response.status_code == HTTP_404_NOT_FOUND
@@ -0,0 +1,92 @@
+import datetime
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from account.models import AccountHistory, AccountHistorySummary, ArchivedAccountHistory, BalanceDiscrepancy
+
+
+@pytest.fixture
+def old_and_recent_history(account_history_factory):
+    # Two transfers made two years ago, followed by ten recent ones.
+    records = []
+    for day in range(12):
+        if day < 2:
+            transaction_date = timezone.now() - datetime.timedelta(days=730 - day)
+        else:
+            transaction_date = timezone.now() - datetime.timedelta(days=12 - day)
+        with patch('django.utils.timezone.now', return_value=transaction_date):
+            records.append(account_history_factory(amount=10.00 + day, description=f'Transfer {day}'))
+    return records
+
+
+def test_archive_history(db, old_and_recent_history, user_account):
+    call_command('archive_history', older_than_days=365, batch_size=1)
+
+    assert list(ArchivedAccountHistory.objects.order_by('id').values_list('id', flat=True)) == [
+        record.id for record in old_and_recent_history[:2]
+    ]
+    assert AccountHistory.objects.count() == 10
+    summary = AccountHistorySummary.objects.get(account=user_account)
+    assert summary.archived_count == 2
+    assert summary.archived_total == 21.00
+    assert summary.archived_until == old_and_recent_history[1].transaction_date
+    assert summary.last_balance_after_transfer == old_and_recent_history[1].balance_after_transfer
+
+
+def test_check_history_falls_through_to_archive(db, django_assert_num_queries, old_and_recent_history, user_account,
+                                                user_client):
+    call_command('archive_history', older_than_days=365)
+    url = reverse('account-check-history', args=[user_account.id])
+
+    # The first page is served by the hot table alone.
+    with django_assert_num_queries(4):
+        response = user_client.get(url)
+    assert response.json()['count'] == 12
+    assert [record['description'] for record in response.json()['results']] == [
+        f'Transfer {day}' for day in range(11, 1, -1)
+    ]
+
+    response = user_client.get(url, {'page': 2})
+    assert [record['id'] for record in response.json()['results']] == [
+        record.id for record in reversed(old_and_recent_history[:2])
+    ]
+
+
+def test_search_history_falls_through_to_archive(db, django_assert_num_queries, old_and_recent_history, user_account,
+                                                 user_client):
+    call_command('archive_history', older_than_days=365)
+    url = reverse('account-search-history', args=[user_account.id])
+
+    response = user_client.get(url, {'date_to': (timezone.now() - datetime.timedelta(days=365)).isoformat()})
+    assert [record['id'] for record in response.json()['results']] == [
+        record.id for record in reversed(old_and_recent_history[:2])
+    ]
+
+    response = user_client.get(url, {'description': 'Transfer 1'})
+    assert [record['description'] for record in response.json()['results']] == [
+        'Transfer 11', 'Transfer 10', 'Transfer 1',
+    ]
+
+    # Searches of recent history do not count archived rows.
+    with django_assert_num_queries(4):
+        response = user_client.get(url, {'date_from': (timezone.now() - datetime.timedelta(days=30)).isoformat()})
+    assert response.json()['count'] == 10
+
+
+def test_reconcile_archived_history(db, old_and_recent_history, user_account):
+    call_command('archive_history', older_than_days=365)
+    call_command('reconcile_balances', workers=1)
+
+    assert not BalanceDiscrepancy.objects.exists()
+
+
+def test_reconcile_fully_archived_history(db, old_and_recent_history, user_account):
+    call_command('archive_history', older_than_days=0)
+    call_command('reconcile_balances', workers=1)
+
+    assert not AccountHistory.objects.exists()
+    assert not BalanceDiscrepancy.objects.exists()
@@ -0,0 +1,72 @@
+from rest_framework.reverse import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_304_NOT_MODIFIED, HTTP_404_NOT_FOUND
+
+
+def test_check_balance_returns_etag(db, user_account, user_client):
+    url = reverse('account-check-balance', args=[user_account.id])
+    response = user_client.get(url)
+
+    assert response.status_code == HTTP_200_OK
+    assert response['ETag'] == f'W/"{user_account.id}-0"'
+
+
+def test_check_balance_not_modified(db, django_assert_num_queries, user_account, user_client):
+    url = reverse('account-check-balance', args=[user_account.id])
+    etag = user_client.get(url)['ETag']
+
+    with django_assert_num_queries(1):
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == HTTP_304_NOT_MODIFIED
+    assert response['ETag'] == etag
+    assert not response.content
+
+
+def test_check_balance_modified_after_transfer(db, user_2_client, user_account, user_client):
+    url = reverse('account-check-balance', args=[user_account.id])
+    etag = user_client.get(url)['ETag']
+    data = {'account_number': user_account.account_number, 'amount': 20.54, 'description': 'Transfer description'}
+    user_2_client.patch(reverse('account-transfer-to-account'), data, format='json')
+
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == HTTP_200_OK
+    assert response['ETag'] != etag
+    assert response.json() == {'balance': data['amount']}
+
+
+def test_check_history_not_modified(
+        account_history_record_income,
+        db,
+        django_assert_num_queries,
+        user_account,
+        user_client,
+):
+    url = reverse('account-check-history', args=[user_account.id])
+    etag = user_client.get(url)['ETag']
+
+    with django_assert_num_queries(1):
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == HTTP_304_NOT_MODIFIED
+
+
+def test_check_history_modified_after_transfer(db, user_account, user_client):
+    user_account.balance = 100.00
+    user_account.save()
+    url = reverse('account-check-history', args=[user_account.id])
+    etag = user_client.get(url)['ETag']
+    data = {'amount': 20.00, 'description': 'Transfer description'}
+    user_client.patch(reverse('account-transfer-from-account', args=[user_account.id]), data, format='json')
+
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == HTTP_200_OK
+    assert response.json()['count'] == 1
+
+
+def test_check_balance_etag_as_not_owner(db, user_2_client, user_account):
+    url = reverse('account-check-balance', args=[user_account.id])
+    response = user_2_client.get(url, HTTP_IF_NONE_MATCH=f'W/"{user_account.id}-0"')
+
+    assert response.status_code == HTTP_404_NOT_FOUND
@@ -0,0 +1,161 @@
+import asyncio
+import base64
+from unittest.mock import Mock, patch
+
+import psycopg2
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from rest_framework.reverse import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_204_NO_CONTENT, HTTP_404_NOT_FOUND, HTTP_501_NOT_IMPLEMENTED
+
+from account.events import Broker, PostgresEventBackend, stream_account_events
+
+
+def test_broker_fans_out_to_account_subscribers():
+    async def scenario():
+        broker = Broker()
+        subscription_1 = broker.subscribe(1, queue_size=10)
+        subscription_2 = broker.subscribe(1, queue_size=10)
+        other_subscription = broker.subscribe(2, queue_size=10)
+        broker.publish(1, {'type': 'transfer'})
+        with pytest.raises(asyncio.TimeoutError):
+            await other_subscription.get(0.01)
+        return [await subscription_1.get(1), await subscription_2.get(1)]
+
+    assert asyncio.run(scenario()) == [{'type': 'transfer'}, {'type': 'transfer'}]
+
+
+def test_broker_unsubscribe():
+    async def scenario():
+        broker = Broker()
+        subscription = broker.subscribe(1, queue_size=10)
+        broker.unsubscribe(subscription)
+        return broker.subscriber_count
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_slow_subscriber_overflow():
+    async def scenario():
+        broker = Broker()
+        subscription = broker.subscribe(1, queue_size=2)
+        for i in range(5):
+            broker.publish(1, {'type': 'transfer', 'version': i})
+        await asyncio.sleep(0)
+        return subscription.overflowed, await subscription.get(1)
+
+    assert asyncio.run(scenario()) == (True, {'type': 'overflow'})
+
+
+def test_broker_broadcast():
+    async def scenario():
+        broker = Broker()
+        subscriptions = [broker.subscribe(1, queue_size=10), broker.subscribe(2, queue_size=10)]
+        broker.broadcast({'type': 'overflow'})
+        return [await subscription.get(1) for subscription in subscriptions]
+
+    assert asyncio.run(scenario()) == [{'type': 'overflow'}, {'type': 'overflow'}]
+
+
+def test_postgres_listener_reconnects_with_backoff():
+    class Stop(Exception):
+        pass
+
+    backend = PostgresEventBackend(Mock())
+    listener_connection = Mock()
+    connect = patch.object(
+        backend,
+        '_connect',
+        side_effect=[psycopg2.OperationalError, psycopg2.OperationalError, listener_connection, listener_connection],
+    )
+    receive = patch.object(backend, '_receive', side_effect=[psycopg2.OperationalError, Stop])
+    with connect, receive, patch('account.events.time.sleep') as sleep, pytest.raises(Stop):
+        backend._listen()
+
+    assert [call.args[0] for call in sleep.call_args_list] == [1, 2, 1]
+    assert listener_connection.close.call_count == 2
+    # Streams are only told to resynchronize once events may have been missed.
+    backend.broker.broadcast.assert_called_once_with({'type': 'overflow'})
+
+
+def test_transfer_publishes_event_on_commit(db, django_capture_on_commit_callbacks, user_2_client, user_account):
+    url = reverse('account-transfer-to-account')
+    data = {'account_number': user_account.account_number, 'amount': 20.54, 'description': 'Transfer description'}
+    with patch('account.events.get_backend') as get_backend:
+        with django_capture_on_commit_callbacks(execute=True):
+            user_2_client.patch(url, data, format='json')
+
+    account_id, event = get_backend.return_value.send.call_args.args
+    assert account_id == user_account.id
+    assert event['type'] == 'transfer'
+    assert event['balance'] == data['amount']
+    assert event['version'] == 1
+    assert event['history']['description'] == data['description']
+
+
+def test_transfer_succeeds_when_event_cannot_be_sent(
+        caplog,
+        db,
+        django_capture_on_commit_callbacks,
+        user_2_client,
+        user_account,
+):
+    url = reverse('account-transfer-to-account')
+    data = {'account_number': user_account.account_number, 'amount': 20.54, 'description': 'Transfer description'}
+    with patch('account.events.get_backend') as get_backend:
+        get_backend.return_value.send.side_effect = psycopg2.OperationalError
+        with django_capture_on_commit_callbacks(execute=True):
+            response = user_2_client.patch(url, data, format='json')
+
+    assert response.status_code == HTTP_204_NO_CONTENT
+    assert 'send_transfer_event' in caplog.text
+
+
+def test_events_as_not_owner(db, user_2_client, user_account):
+    url = reverse('account-events', args=[user_account.id])
+    response = user_2_client.get(url)
+
+    assert response.status_code == HTTP_404_NOT_FOUND
+
+
+def test_events_require_asgi(db, user_account, user_client):
+    url = reverse('account-events', args=[user_account.id])
+    response = user_client.get(url)
+
+    assert response.status_code == HTTP_501_NOT_IMPLEMENTED
+
+
+def test_events_stream_balance_snapshot(db, user, user_account):
+    user.set_password('password')
+    user.save()
+    credentials = base64.b64encode(b'user:password').decode()
+    url = reverse('account-events', args=[user_account.id])
+
+    async def scenario():
+        response = await AsyncClient().get(
+            url,
+            headers={'Accept': 'text/event-stream', 'Authorization': f'Basic {credentials}'},
+        )
+        stream = aiter(response.streaming_content)
+        chunks = [await anext(stream), await anext(stream)]
+        await stream.aclose()
+        return response, chunks
+
+    response, chunks = async_to_sync(scenario)()
+
+    assert response.status_code == HTTP_200_OK
+    assert response['Content-Type'] == 'text/event-stream'
+    assert chunks[0] == b'retry: 3000\n'
+    snapshot = f'{{"account_id": {user_account.id}, "balance": 0.0, "version": 0}}'
+    assert chunks[1] == f'event: balance\ndata: {snapshot}\n\n'.encode()
+
+
+def test_events_stream_ends_for_deleted_account(db, user_account):
+    account_id = user_account.id
+    user_account.delete()
+
+    async def scenario():
+        return [chunk async for chunk in stream_account_events(account_id)]
+
+    assert async_to_sync(scenario)() == []
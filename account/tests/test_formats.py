@@ -0,0 +1,68 @@
+import msgpack
+from rest_framework.reverse import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_204_NO_CONTENT, HTTP_400_BAD_REQUEST
+
+from account.models import Account
+
+
+def test_check_history_as_msgpack(account_history_record_income, db, user_account, user_client):
+    response = user_client.get(
+        reverse('account-check-history', args=[user_account.id]),
+        HTTP_ACCEPT='application/msgpack',
+    )
+
+    assert response.status_code == HTTP_200_OK
+    assert response['Content-Type'] == 'application/msgpack'
+    page = msgpack.unpackb(response.content)
+    assert page['count'] == 1
+    assert page['results'][0]['amount'] == account_history_record_income.amount
+    assert page['results'][0]['transaction_date'] == account_history_record_income.transaction_date.strftime(
+        '%Y-%m-%d %H:%M:%S',
+    )
+
+
+def test_check_history_as_msgpack_by_format(db, user_account, user_client):
+    response = user_client.get(reverse('account-check-history', args=[user_account.id]), {'format': 'msgpack'})
+
+    assert msgpack.unpackb(response.content)['count'] == 0
+
+
+def test_transfer_from_msgpack(db, user_account, user_client):
+    data = {'account_number': user_account.account_number, 'amount': 20.54, 'description': 'Transfer description'}
+    response = user_client.patch(
+        reverse('account-transfer-to-account'),
+        msgpack.packb(data),
+        content_type='application/msgpack',
+    )
+
+    assert response.status_code == HTTP_204_NO_CONTENT
+    assert Account.objects.get(id=user_account.id).balance == 20.54
+
+
+def test_transfer_from_invalid_msgpack(db, user_account, user_client):
+    response = user_client.patch(
+        reverse('account-transfer-from-account', args=[user_account.id]),
+        b'\xc1',
+        content_type='application/msgpack',
+    )
+
+    assert response.status_code == HTTP_400_BAD_REQUEST
+
+
+def test_transfer_from_msgpack_with_unhashable_key(db, user_account, user_client):
+    response = user_client.patch(
+        reverse('account-transfer-from-account', args=[user_account.id]),
+        b'\x81\x80\x01',
+        content_type='application/msgpack',
+    )
+
+    assert response.status_code == HTTP_400_BAD_REQUEST
+
+
+def test_conditional_responses_vary_by_accept(db, user_account, user_client):
+    url = reverse('account-check-balance', args=[user_account.id])
+    response = user_client.get(url, HTTP_ACCEPT='application/msgpack')
+
+    assert 'Accept' in response['Vary']
+    response = user_client.get(url, HTTP_ACCEPT='application/json', HTTP_IF_NONE_MATCH=response['ETag'])
+    assert 'Accept' in response['Vary']
@@ -0,0 +1,156 @@
+import os
+
+import pytest
+from django.utils import timezone
+from rest_framework.reverse import reverse
+from rest_framework.status import (
+    HTTP_200_OK,
+    HTTP_201_CREATED,
+    HTTP_204_NO_CONTENT,
+    HTTP_304_NOT_MODIFIED,
+    HTTP_400_BAD_REQUEST,
+)
+
+from account.analytics import month_of
+from account.fx import FXRates, RateTable, UnsupportedCurrency
+from account.models import Account, AccountHistory, MonthlyTotal
+
+
+@pytest.fixture
+def rates_file(settings, tmp_path):
+    path = tmp_path / 'fx_rates.csv'
+    path.write_text('currency,rate\nEUR,4.5\nUSD,4.0\n')
+    settings.FX_RATES_PATH = path
+    # Rates are reloaded on every use, so that the rate table shared by the tests follows the file.
+    settings.FX_RATES_CHECK_SECONDS = 0
+    return path
+
+
+@pytest.fixture
+def fx_rates(rates_file):
+    return FXRates()
+
+
+def test_rate_table(rates_file):
+    table = RateTable.load(rates_file)
+
+    assert table.rate('EUR', 'PLN') == 4.5
+    assert table.convert(10.00, 'EUR', 'USD') == 11.25
+    assert table.convert_many([10.00, 20.00, 30.00], ['EUR', 'PLN', 'EUR'], 'PLN') == [45.00, 20.00, 135.00]
+    with pytest.raises(UnsupportedCurrency):
+        table.rate('XYZ', 'PLN')
+
+
+def test_rates_are_reloaded_when_the_file_changes(fx_rates, rates_file):
+    assert fx_rates.convert(1.00, 'EUR', 'PLN') == 4.5
+
+    rates_file.write_text('currency,rate\nEUR,4.75\nUSD,4.0\n')
+    stat = rates_file.stat()
+    os.utime(rates_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    assert fx_rates.convert(1.00, 'EUR', 'PLN') == 4.75
+
+
+def test_last_rates_are_kept_when_the_file_cannot_be_loaded(fx_rates, rates_file):
+    assert fx_rates.convert(1.00, 'EUR', 'PLN') == 4.5
+
+    rates_file.write_text('currency,rate\nEUR,4.75\nUSD,')
+
+    assert fx_rates.convert(1.00, 'EUR', 'PLN') == 4.5
+    rates_file.unlink()
+    assert fx_rates.convert(1.00, 'EUR', 'PLN') == 4.5
+
+
+def test_missing_rates_file(settings, tmp_path):
+    settings.FX_RATES_PATH = tmp_path / 'fx_rates.csv'
+
+    fx_rates = FXRates()
+
+    assert fx_rates.is_supported('PLN')
+    assert not fx_rates.is_supported('EUR')
+
+
+def test_transfer_in_account_currency_without_rates(db, settings, tmp_path, user_account, user_client):
+    settings.FX_RATES_PATH = tmp_path / 'fx_rates.csv'
+    Account.objects.filter(id=user_account.id).update(balance=10.00)
+    data = {'amount': 5.00, 'currency': 'pln', 'description': 'Transfer description'}
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr('account.views.fx_rates', FXRates())
+        url = reverse('account-transfer-from-account', args=[user_account.id])
+        response = user_client.patch(url, data, format='json')
+
+    assert response.status_code == HTTP_204_NO_CONTENT
+    assert AccountHistory.objects.get().exchange_rate is None
+
+
+def test_create_account_in_currency(db, rates_file, user_client):
+    response = user_client.post(reverse('account-list'), {'account_name': 'Euro account', 'currency': 'eur'})
+
+    assert response.status_code == HTTP_201_CREATED
+    assert Account.objects.get().currency == 'EUR'
+
+
+def test_create_account_in_unsupported_currency(db, rates_file, user_client):
+    response = user_client.post(reverse('account-list'), {'account_name': 'Some account', 'currency': 'XYZ'})
+
+    assert response.status_code == HTTP_400_BAD_REQUEST
+
+
+def test_cross_currency_transfer(db, fx_rates, user_account, user_client):
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr('account.transfers.fx_rates', fx_rates)
+        monkeypatch.setattr('account.views.fx_rates', fx_rates)
+        data = {
+            'account_number': user_account.account_number,
+            'amount': 10.00,
+            'currency': 'EUR',
+            'description': 'Transfer description',
+        }
+        response = user_client.patch(reverse('account-transfer-to-account'), data, format='json')
+        assert response.status_code == HTTP_204_NO_CONTENT
+
+        data = {'amount': 5.00, 'currency': 'usd', 'description': 'Transfer description'}
+        url = reverse('account-transfer-from-account', args=[user_account.id])
+        response = user_client.patch(url, data, format='json')
+        assert response.status_code == HTTP_204_NO_CONTENT
+
+    assert Account.objects.get(id=user_account.id).balance == 25.00
+    history = AccountHistory.objects.order_by('id').values_list(
+        'amount', 'currency', 'exchange_rate', 'original_amount', 'original_currency',
+    )
+    assert list(history) == [
+        (45.00, 'PLN', 4.5, 10.00, 'EUR'),
+        (20.00, 'PLN', 4.0, 5.00, 'USD'),
+    ]
+
+
+def test_transfer_in_unsupported_currency(db, rates_file, user_account, user_client):
+    data = {'amount': 5.00, 'currency': 'XYZ', 'description': 'Transfer description'}
+    url = reverse('account-transfer-from-account', args=[user_account.id])
+    response = user_client.patch(url, data, format='json')
+
+    assert response.status_code == HTTP_400_BAD_REQUEST
+    assert not AccountHistory.objects.exists()
+
+
+def test_analytics_etag_follows_currency_and_rates(db, fx_rates, rates_file, user_account, user_client):
+    MonthlyTotal.objects.create(account=user_account, month=month_of(timezone.now()), type='I', total=90.00, count=1)
+    url = reverse('account-analytics', args=[user_account.id])
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr('account.views.fx_rates', fx_rates)
+        response = user_client.get(url, {'currency': 'EUR'})
+        assert response.json()['months'][0]['incoming'] == 20.00
+        etag = response['ETag']
+
+        assert user_client.get(url, {'currency': 'EUR'}, HTTP_IF_NONE_MATCH=etag).status_code == HTTP_304_NOT_MODIFIED
+        assert user_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == HTTP_200_OK
+
+        rates_file.write_text('currency,rate\nEUR,4.0\nUSD,4.0\n')
+        stat = rates_file.stat()
+        os.utime(rates_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        response = user_client.get(url, {'currency': 'EUR'}, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == HTTP_200_OK
+    assert response.json()['months'][0]['incoming'] == 22.50
@@ -0,0 +1,74 @@
+import datetime
+import json
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.reverse import reverse
+
+from account import metrics
+from account.models import AccountHistory, OutboxEvent
+from account.outbox import MemorySink, lag_seconds, relay_batch
+
+
+def transfer(client, account, amount):
+    data = {'account_number': account.account_number, 'amount': amount, 'description': 'Transfer description'}
+    client.patch(reverse('account-transfer-to-account'), data, format='json')
+
+
+def test_transfer_writes_outbox_event(db, user_account, user_client):
+    transfer(user_client, user_account, 20.00)
+
+    event = OutboxEvent.objects.get()
+    assert event.topic == 'transfer'
+    assert event.payload['account_id'] == user_account.id
+    assert event.payload['balance'] == 20.00
+    assert event.payload['history']['id'] == AccountHistory.objects.get().id
+
+
+def test_relay_batches_in_id_order(db, user_account, user_client):
+    for amount in (10.00, 20.00, 30.00):
+        transfer(user_client, user_account, amount)
+    sink = MemorySink()
+
+    assert relay_batch(sink, batch_size=2) == 2
+    assert relay_batch(sink, batch_size=2) == 1
+    assert relay_batch(sink, batch_size=2) == 0
+
+    assert [event['history']['amount'] for event in sink.events] == [10.00, 20.00, 30.00]
+    assert sorted(event['id'] for event in sink.events) == [event['id'] for event in sink.events]
+    assert not OutboxEvent.objects.exists()
+    assert metrics.snapshot()['outbox.relayed'] == 3
+
+
+def test_failed_publish_keeps_events(db, user_account, user_client):
+    class FailingSink:
+        def publish(self, events):
+            raise ConnectionError
+
+    transfer(user_client, user_account, 10.00)
+
+    with pytest.raises(ConnectionError):
+        relay_batch(FailingSink(), batch_size=10)
+
+    assert OutboxEvent.objects.count() == 1
+
+
+def test_relay_outbox_to_ndjson(db, settings, tmp_path, user_account, user_client):
+    settings.ACCOUNT_OUTBOX_NDJSON_PATH = tmp_path / 'outbox.ndjson'
+    transfer(user_client, user_account, 10.00)
+    transfer(user_client, user_account, 5.00)
+
+    call_command('relay_outbox', once=True)
+
+    lines = (tmp_path / 'outbox.ndjson').read_text().splitlines()
+    assert [json.loads(line)['balance'] for line in lines] == [10.00, 15.00]
+
+
+def test_lag_is_read_from_the_database(db, user_account, user_client):
+    transfer(user_client, user_account, 10.00)
+    OutboxEvent.objects.update(created_at=timezone.now() - datetime.timedelta(minutes=5))
+
+    assert 300 <= lag_seconds() < 360
+    relay_batch(MemorySink(), batch_size=10)
+    assert lag_seconds() == 0
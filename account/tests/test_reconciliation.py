@@ -0,0 +1,49 @@
+from django.core.management import call_command
+
+from account.models import Account, AccountHistory, BalanceDiscrepancy
+
+
+def test_reconcile_consistent_balances(account_history_factory, db, user_account, user_account_2):
+    account_history_factory(amount=100.00)
+    account_history_factory(amount=30.25, transfer_type='O')
+    call_command('reconcile_balances', workers=1)
+
+    assert not BalanceDiscrepancy.objects.exists()
+
+
+def test_reconcile_balance_not_matching_history(account_history_factory, db, user_account, user_account_2):
+    account_history_factory(amount=100.00)
+    Account.objects.filter(id=user_account.id).update(balance=120.00)
+    call_command('reconcile_balances', workers=1, partition_size=1)
+
+    discrepancy = BalanceDiscrepancy.objects.get()
+    assert discrepancy.account_id == user_account.id
+    assert discrepancy.balance == 120.00
+    assert discrepancy.history_total == 100.00
+    assert discrepancy.last_balance_after_transfer == 100.00
+
+
+def test_reconcile_last_balance_after_transfer_not_matching(account_history_factory, db, user_account):
+    account_history_factory(amount=100.00)
+    AccountHistory.objects.update(balance_after_transfer=90.00)
+    call_command('reconcile_balances', workers=1)
+
+    assert BalanceDiscrepancy.objects.get().last_balance_after_transfer == 90.00
+
+
+def test_reconcile_balance_without_history(db, user_account):
+    Account.objects.filter(id=user_account.id).update(balance=50.00)
+    call_command('reconcile_balances', workers=1)
+
+    discrepancy = BalanceDiscrepancy.objects.get()
+    assert discrepancy.history_total == 0
+    assert discrepancy.last_balance_after_transfer is None
+
+
+def test_reconcile_within_tolerance(account_history_factory, db, user_account):
+    account_history_factory(amount=0.1)
+    account_history_factory(amount=0.2)
+    Account.objects.filter(id=user_account.id).update(balance=0.3)
+    call_command('reconcile_balances', workers=1)
+
+    assert not BalanceDiscrepancy.objects.exists()
@@ -0,0 +1,76 @@
+from unittest.mock import patch
+
+import pytest
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from rest_framework.reverse import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_204_NO_CONTENT
+
+from account.models import Account, AccountHistory
+from account.routers import ReplicaRouter, is_pinned_to_primary, pin_to_primary, replica_reads
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.REPLICA_DATABASES = ['replica_0', 'replica_1']
+    return settings.REPLICA_DATABASES
+
+
+@pytest.fixture
+def replica(settings):
+    settings.REPLICA_DATABASES = ['replica_0']
+
+
+def test_reads_go_to_primary_by_default(replicas):
+    assert ReplicaRouter().db_for_read(Account) == 'default'
+
+
+def test_replica_reads(replicas):
+    with replica_reads():
+        assert ReplicaRouter().db_for_read(AccountHistory) in replicas
+        assert ReplicaRouter().db_for_write(AccountHistory) == 'default'
+
+
+def test_replica_reads_without_replicas(settings):
+    settings.REPLICA_DATABASES = []
+    with replica_reads():
+        assert ReplicaRouter().db_for_read(Account) == 'default'
+
+
+def test_pin_to_primary_expires(user):
+    pin_to_primary(user)
+
+    assert is_pinned_to_primary(user)
+    with patch('django.core.cache.backends.locmem.time.time', return_value=2 ** 40):
+        assert not is_pinned_to_primary(user)
+
+
+# `replica_0` mirrors the test database through its own connection, so test data has to be committed.
+@pytest.mark.django_db(transaction=True, databases=['default', 'replica_0'])
+def test_check_balance_reads_from_replica(replica, user_account, user_client):
+    url = reverse('account-check-balance', args=[user_account.id])
+    with CaptureQueriesContext(connections['default']) as primary_queries, \
+            CaptureQueriesContext(connections['replica_0']) as replica_queries:
+        response = user_client.get(url)
+
+    assert response.status_code == HTTP_200_OK
+    assert response.json()['balance'] == user_account.balance
+    assert any('account_account' in query['sql'] for query in replica_queries)
+    assert not any('account_account' in query['sql'] for query in primary_queries)
+
+
+# `replica_0` mirrors the test database through its own connection, so test data has to be committed.
+@pytest.mark.django_db(transaction=True, databases=['default', 'replica_0'])
+def test_transfer_pins_user_to_primary(replica, user_account, user_client):
+    user_account.balance = 100.00
+    user_account.save()
+    url = reverse('account-transfer-from-account', args=[user_account.id])
+    data = {'amount': 20.00, 'description': 'Transfer description'}
+    with CaptureQueriesContext(connections['replica_0']) as replica_queries:
+        response = user_client.patch(url, data, format='json')
+        balance_response = user_client.get(reverse('account-check-balance', args=[user_account.id]))
+
+    assert response.status_code == HTTP_204_NO_CONTENT
+    assert is_pinned_to_primary(user_account.owner)
+    assert balance_response.json()['balance'] == 80.00
+    assert not replica_queries
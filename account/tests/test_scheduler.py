@@ -0,0 +1,97 @@
+import datetime
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.reverse import reverse
+from rest_framework.status import HTTP_201_CREATED, HTTP_204_NO_CONTENT, HTTP_400_BAD_REQUEST
+
+from account.models import Account, AccountHistory, ScheduledTransfer, ScheduledTransferRun
+from account.scheduler import add_months, run_due_batch
+
+NOW = datetime.datetime(2023, 4, 15, 12, tzinfo=datetime.timezone.utc)
+
+
+def schedule(account, amount, first_run_at, recurrence=''):
+    return ScheduledTransfer.objects.create(
+        account=account,
+        amount=amount,
+        description='Standing order',
+        recurrence=recurrence,
+        first_run_at=first_run_at,
+        next_run_at=first_run_at,
+    )
+
+
+@pytest.mark.parametrize('moment, months, expected', (
+    (datetime.datetime(2023, 1, 31), 1, datetime.datetime(2023, 2, 28)),
+    (datetime.datetime(2023, 1, 31), 2, datetime.datetime(2023, 3, 31)),
+    (datetime.datetime(2023, 11, 15), 3, datetime.datetime(2024, 2, 15)),
+))
+def test_add_months(moment, months, expected):
+    assert add_months(moment, months) == expected
+
+
+def test_run_due_batch(db, user_account):
+    Account.objects.filter(id=user_account.id).update(balance=100.00)
+    monthly = schedule(user_account, 30.00, NOW - datetime.timedelta(hours=1), recurrence='M')
+    once = schedule(user_account, 200.00, NOW - datetime.timedelta(minutes=1))
+    later = schedule(user_account, 10.00, NOW + datetime.timedelta(hours=1))
+
+    assert run_due_batch(batch_size=10, now=NOW) == (1, 1)
+    assert run_due_batch(batch_size=10, now=NOW) == (0, 0)
+
+    assert Account.objects.get(id=user_account.id).balance == 70.00
+    run = ScheduledTransferRun.objects.get(scheduled_transfer=monthly)
+    assert (run.status, run.account_history_id) == ('S', AccountHistory.objects.get().id)
+    run = ScheduledTransferRun.objects.get(scheduled_transfer=once)
+    assert (run.status, run.error) == ('F', 'You do not have enough funds in your account')
+
+    monthly.refresh_from_db()
+    once.refresh_from_db()
+    later.refresh_from_db()
+    assert monthly.next_run_at == datetime.datetime(2023, 5, 15, 11, tzinfo=datetime.timezone.utc)
+    assert monthly.active
+    assert not once.active
+    assert later.run_count == 0
+
+
+def test_run_scheduled_transfers_catches_up(db, user_account):
+    Account.objects.filter(id=user_account.id).update(balance=100.00)
+    schedule(user_account, 5.00, timezone.now() - datetime.timedelta(days=20), recurrence='W')
+
+    call_command('run_scheduled_transfers', workers=1, batch_size=2, once=True)
+
+    # Every missed week is executed.
+    assert ScheduledTransferRun.objects.filter(status='S').count() == 3
+    assert Account.objects.get(id=user_account.id).balance == 85.00
+
+
+def test_create_and_cancel_scheduled_transfer(db, user_account, user_client):
+    data = {
+        'account': user_account.id,
+        'amount': 20.00,
+        'description': 'Rent',
+        'recurrence': 'M',
+        'first_run_at': '2023-05-01T08:00:00Z',
+        # Incoming transfers would create money, they cannot be scheduled.
+        'type': 'I',
+    }
+    response = user_client.post(reverse('scheduled-transfer-list'), data, format='json')
+
+    assert response.status_code == HTTP_201_CREATED
+    assert response.json()['next_run_at'] == '2023-05-01T08:00:00Z'
+    assert response.json()['type'] == 'O'
+
+    response = user_client.delete(reverse('scheduled-transfer-detail', args=[response.json()['id']]))
+
+    assert response.status_code == HTTP_204_NO_CONTENT
+    assert not ScheduledTransfer.objects.get().active
+
+
+def test_schedule_transfer_from_not_owned_account(db, user_2_client, user_account):
+    data = {'account': user_account.id, 'amount': 20.00, 'first_run_at': '2023-05-01T08:00:00Z'}
+    response = user_2_client.post(reverse('scheduled-transfer-list'), data, format='json')
+
+    assert response.status_code == HTTP_400_BAD_REQUEST
+    assert not ScheduledTransfer.objects.exists()
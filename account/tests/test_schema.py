@@ -0,0 +1,54 @@
+import logging
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from rest_framework.reverse import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_304_NOT_MODIFIED
+
+
+@pytest.fixture
+def schema_path(settings, tmp_path):
+    settings.OPENAPI_SCHEMA_PATH = tmp_path / 'openapi.json'
+    return settings.OPENAPI_SCHEMA_PATH
+
+
+def test_generate_openapi_schema(caplog, schema_path):
+    call_command('generate_openapi_schema')
+
+    assert b'/accounts/{id}/check_balance/' in schema_path.read_bytes()
+    # Views are introspected without a request, failures are logged rather than raised.
+    assert not [record for record in caplog.records if record.levelno >= logging.WARNING]
+
+
+def test_schema_generated_on_first_request(client, schema_path):
+    response = client.get(reverse('schema-json'))
+
+    assert response.status_code == HTTP_200_OK
+    assert response.content == schema_path.read_bytes()
+    assert response['ETag']
+
+
+def test_schema_served_without_introspection(client, schema_path):
+    schema_path.write_bytes(b'{"swagger": "2.0"}')
+    with patch('banking_account.swagger.generate_schema') as generate_schema:
+        response = client.get(reverse('schema-json'))
+
+    assert response.content == b'{"swagger": "2.0"}'
+    generate_schema.assert_not_called()
+
+
+def test_schema_not_modified(client, schema_path):
+    etag = client.get(reverse('schema-json'))['ETag']
+    response = client.get(reverse('schema-json'), HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == HTTP_304_NOT_MODIFIED
+
+
+def test_swagger_ui_does_not_generate_schema(client):
+    with patch('banking_account.swagger.OpenAPISchemaGenerator') as generator:
+        response = client.get(reverse('schema-swagger-ui'))
+
+    assert response.status_code == HTTP_200_OK
+    assert reverse('schema-json') in response.content.decode()
+    generator.assert_not_called()
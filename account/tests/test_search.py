@@ -0,0 +1,96 @@
+import datetime
+from unittest.mock import patch
+
+import pytest
+from django.db import connection
+from rest_framework.reverse import reverse
+from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST, HTTP_404_NOT_FOUND
+
+from account.models import AccountHistory
+
+
+def explain(queryset) -> str:
+    if connection.vendor == 'postgresql':
+        # Tables in tests are tiny, so the planner would prefer sequential scans over any index.
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+    return queryset.explain()
+
+
+@pytest.fixture
+def account_history(account_history_factory):
+    records = []
+    for day, amount, transfer_type, description in (
+        (1, 100.00, 'I', 'Salary'),
+        (2, 20.50, 'O', 'Groceries'),
+        (3, 45.00, 'O', 'Electricity bill'),
+        (4, 250.00, 'I', 'Tax return'),
+    ):
+        transaction_date = datetime.datetime(2023, 4, day, tzinfo=datetime.timezone.utc)
+        with patch('django.utils.timezone.now', return_value=transaction_date):
+            records.append(account_history_factory(amount=amount, description=description, transfer_type=transfer_type))
+    return records
+
+
+@pytest.mark.parametrize(
+    'params, expected',
+    [
+        ({}, [3, 2, 1, 0]),
+        ({'type': 'O'}, [2, 1]),
+        ({'amount_min': 45}, [3, 2, 0]),
+        ({'amount_min': 40, 'amount_max': 100}, [2, 0]),
+        ({'date_from': '2023-04-02T00:00:00Z', 'date_to': '2023-04-03T00:00:00Z'}, [2, 1]),
+        ({'description': 'BILL'}, [2]),
+        ({'type': 'I', 'amount_max': 200}, [0]),
+    ],
+)
+def test_search_history(account_history, db, params, expected, user_account, user_client):
+    url = reverse('account-search-history', args=[user_account.id])
+    response = user_client.get(url, params)
+
+    assert response.status_code == HTTP_200_OK
+    response = response.json()
+    assert response['count'] == len(expected)
+    assert [result['id'] for result in response['results']] == [account_history[i].id for i in expected]
+
+
+@pytest.mark.parametrize(
+    'params',
+    [
+        {'type': 'X'},
+        {'amount_min': 100, 'amount_max': 10},
+        {'date_from': '2023-04-03T00:00:00Z', 'date_to': '2023-04-02T00:00:00Z'},
+        {'description': 'ab'},
+    ],
+)
+def test_search_history_invalid_filters(db, params, user_account, user_client):
+    url = reverse('account-search-history', args=[user_account.id])
+    response = user_client.get(url, params)
+
+    assert response.status_code == HTTP_400_BAD_REQUEST
+
+
+def test_search_history_as_not_owner(account_history, db, user_2_client, user_account):
+    url = reverse('account-search-history', args=[user_account.id])
+    response = user_2_client.get(url)
+
+    assert response.status_code == HTTP_404_NOT_FOUND
+
+
+@pytest.mark.parametrize(
+    'filters, index',
+    [
+        ({'type': 'I'}, 'history_account_date_idx'),
+        ({'amount_min': 40, 'amount_max': 100}, 'history_account_amount_idx'),
+        ({'date_from': datetime.datetime(2023, 4, 2, tzinfo=datetime.timezone.utc)}, 'history_account_date_idx'),
+        # The trigram index only exists on PostgreSQL.
+        ({'description': 'bill'}, 'history_description_trgm_idx' if connection.vendor == 'postgresql' else None),
+    ],
+)
+def test_search_history_query_plan_uses_index(account_history, db, filters, index, user_account):
+    if index is None:
+        pytest.skip(f'No index for {filters} on {connection.vendor}')
+    queryset = AccountHistory.objects.filter(account=user_account).search(**filters).order_by('-transaction_date')
+
+    # The account_id foreign key index alone would also avoid a full scan, so the plan must name the search index.
+    assert index in explain(queryset)
@@ -0,0 +1,106 @@
+import csv
+import datetime
+import gzip
+from unittest.mock import patch
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from account.models import Account
+
+
+def read_statement(path):
+    with gzip.open(path, 'rt', newline='') as statement:
+        return list(csv.reader(statement))
+
+
+@pytest.fixture
+def april_history(account_history_factory, user_account, user_account_2):
+    for day, amount, transfer_type in ((31, 100.00, 'I'), (1, 20.50, 'I'), (15, 30.00, 'O')):
+        month = 3 if day == 31 else 4
+        transaction_date = datetime.datetime(2023, month, day, tzinfo=datetime.timezone.utc)
+        with patch('django.utils.timezone.now', return_value=transaction_date):
+            account_history_factory(amount=amount, description=f'Transfer {day}', transfer_type=transfer_type)
+    Account.objects.update(creation_date=datetime.date(2023, 1, 1))
+
+
+def test_generate_statements(april_history, db, tmp_path, user_account, user_account_2):
+    call_command('generate_statements', month='2023-04', output_dir=tmp_path, workers=1, partition_size=1)
+
+    statement = read_statement(tmp_path / '2023-04' / f'{user_account.account_number}.csv.gz')
+    assert statement == [
+        ['date', 'type', 'description', 'amount', 'balance'],
+        ['2023-04-01T00:00:00+00:00', '', 'Opening balance', '', '100.0'],
+        ['2023-04-01T00:00:00+00:00', 'I', 'Transfer 1', '20.5', '120.5'],
+        ['2023-04-15T00:00:00+00:00', 'O', 'Transfer 15', '30.0', '90.5'],
+        ['2023-05-01T00:00:00+00:00', '', 'Closing balance', '', '90.5'],
+    ]
+    statement = read_statement(tmp_path / '2023-04' / f'{user_account_2.account_number}.csv.gz')
+    assert [row[2] for row in statement[1:]] == ['Opening balance', 'Closing balance']
+
+
+@pytest.mark.django_db(transaction=True)
+def test_generate_statements_in_worker_processes(april_history, tmp_path, user_account, user_account_2):
+    # Forked workers open their own connections, so they only see committed data.
+    call_command('generate_statements', month='2023-04', output_dir=tmp_path, workers=2, partition_size=1)
+
+    for account in (user_account, user_account_2):
+        assert (tmp_path / '2023-04' / f'{account.account_number}.csv.gz').exists()
+    statement = read_statement(tmp_path / '2023-04' / f'{user_account.account_number}.csv.gz')
+    assert statement[-1] == ['2023-05-01T00:00:00+00:00', '', 'Closing balance', '', '90.5']
+
+
+def test_generate_statements_from_archive(april_history, db, tmp_path, user_account):
+    # The month is split between the archive and the hot table.
+    older_than_days = (timezone.now() - datetime.datetime(2023, 4, 10, tzinfo=datetime.timezone.utc)).days
+    call_command('archive_history', older_than_days=older_than_days)
+    call_command('generate_statements', month='2023-04', output_dir=tmp_path, workers=1)
+
+    statement = read_statement(tmp_path / '2023-04' / f'{user_account.account_number}.csv.gz')
+    assert [row[2] for row in statement[1:]] == ['Opening balance', 'Transfer 1', 'Transfer 15', 'Closing balance']
+    assert statement[1][4] == '100.0'
+
+
+def test_generate_statements_in_currency(april_history, db, settings, tmp_path, user_account):
+    settings.FX_RATES_PATH = tmp_path / 'fx_rates.csv'
+    settings.FX_RATES_PATH.write_text('currency,rate\nEUR,4.0\n')
+    settings.FX_RATES_CHECK_SECONDS = 0
+    call_command('generate_statements', month='2023-04', output_dir=tmp_path, workers=1, currency='eur')
+
+    statement = read_statement(tmp_path / '2023-04' / 'EUR' / f'{user_account.account_number}.csv.gz')
+    assert [row[3:] for row in statement[1:]] == [['', '25.0'], ['5.12', '30.12'], ['7.5', '22.62'], ['', '22.62']]
+
+
+def test_generate_statements_resumes(april_history, db, tmp_path, user_account, user_account_2):
+    month_dir = tmp_path / '2023-04'
+    month_dir.mkdir()
+    (month_dir / f'{user_account.account_number}.csv.gz').write_bytes(b'written before the crash')
+
+    call_command('generate_statements', month='2023-04', output_dir=tmp_path, workers=1)
+
+    assert (month_dir / f'{user_account.account_number}.csv.gz').read_bytes() == b'written before the crash'
+    assert (month_dir / f'{user_account_2.account_number}.csv.gz').exists()
+    assert list((month_dir / '.partitions').iterdir())
+
+
+def test_generate_statements_skips_accounts_opened_later(april_history, db, tmp_path, user_account):
+    Account.objects.filter(id=user_account.id).update(creation_date=datetime.date(2023, 5, 1))
+    call_command('generate_statements', month='2023-04', output_dir=tmp_path, workers=1)
+
+    assert not (tmp_path / '2023-04' / f'{user_account.account_number}.csv.gz').exists()
+
+
+def test_generate_statements_skips_finished_partitions(april_history, db, tmp_path, user_account):
+    call_command('generate_statements', month='2023-04', output_dir=tmp_path, workers=1)
+    statement = tmp_path / '2023-04' / f'{user_account.account_number}.csv.gz'
+    statement.unlink()
+
+    call_command('generate_statements', month='2023-04', output_dir=tmp_path, workers=1)
+
+    assert not statement.exists()
+
+
+def test_generate_statements_invalid_month(db, tmp_path):
+    with pytest.raises(CommandError):
+        call_command('generate_statements', month='04-2023', output_dir=tmp_path, workers=1)
@@ -0,0 +1,115 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from rest_framework.reverse import reverse
+from rest_framework.status import (
+    HTTP_200_OK,
+    HTTP_204_NO_CONTENT,
+    HTTP_403_FORBIDDEN,
+    HTTP_429_TOO_MANY_REQUESTS,
+    HTTP_503_SERVICE_UNAVAILABLE,
+)
+
+from account.models import AccountHistory
+from account.throttling import AccountTransferThrottle, UserTransferThrottle
+
+
+def transfer_to_account(client, account):
+    url = reverse('account-transfer-to-account')
+    data = {'account_number': account.account_number, 'amount': 1.00, 'description': 'Transfer description'}
+    return client.patch(url, data, format='json')
+
+
+def test_user_transfer_throttle(db, user_2_client, user_account):
+    with patch.object(UserTransferThrottle, 'rate', '2/min', create=True):
+        responses = [transfer_to_account(user_2_client, user_account) for _ in range(3)]
+
+    assert [response.status_code for response in responses] == [
+        HTTP_204_NO_CONTENT,
+        HTTP_204_NO_CONTENT,
+        HTTP_429_TOO_MANY_REQUESTS,
+    ]
+    assert int(responses[-1]['Retry-After']) == 30
+    assert AccountHistory.objects.count() == 2
+
+
+def test_user_transfer_throttle_refills_tokens(db, user_2_client, user_account):
+    with patch.object(UserTransferThrottle, 'rate', '1/min', create=True):
+        with patch.object(UserTransferThrottle, 'timer', return_value=1000.0):
+            transfer_to_account(user_2_client, user_account)
+        with patch.object(UserTransferThrottle, 'timer', return_value=1060.0):
+            response = transfer_to_account(user_2_client, user_account)
+
+    assert response.status_code == HTTP_204_NO_CONTENT
+
+
+def test_account_transfer_throttle(db, user_client, user_2_client, user_account):
+    with patch.object(AccountTransferThrottle, 'rate', '1/min', create=True):
+        transfer_to_account(user_client, user_account)
+        response = transfer_to_account(user_2_client, user_account)
+
+    assert response.status_code == HTTP_429_TOO_MANY_REQUESTS
+
+
+def test_account_transfer_throttle_is_shared_by_directions(db, user_client, user_account):
+    with patch.object(AccountTransferThrottle, 'rate', '1/min', create=True):
+        transfer_to_account(user_client, user_account)
+        url = reverse('account-transfer-from-account', args=[user_account.id])
+        response = user_client.patch(url, {'amount': 1.00, 'description': 'Transfer description'}, format='json')
+
+    assert response.status_code == HTTP_429_TOO_MANY_REQUESTS
+
+
+def test_token_bucket_is_locked(db, user_2, user_2_client, user_account):
+    # Another request is updating the bucket.
+    caches['throttle'].add(f'throttle_transfer_user_{user_2.pk}_lock', True)
+    with patch.object(UserTransferThrottle, 'rate', '10/min', create=True), \
+            patch.object(UserTransferThrottle, 'lock_attempts', 2):
+        response = transfer_to_account(user_2_client, user_account)
+
+    assert response.status_code == HTTP_429_TOO_MANY_REQUESTS
+
+
+def test_in_flight_counter_does_not_go_negative(db, user_2_client, user_account):
+    def expire_counter(*args, **kwargs):
+        # The counter expires and is created again by another request, which has finished already.
+        caches['throttle'].set('in_flight_transfer', 0)
+        return allow_request(*args, **kwargs)
+
+    allow_request = AccountTransferThrottle.allow_request
+    with patch.object(AccountTransferThrottle, 'allow_request', expire_counter):
+        transfer_to_account(user_2_client, user_account)
+
+    assert caches['throttle'].get('in_flight_transfer') == 0
+
+
+def test_in_flight_limit_sheds_transfers(db, settings, user_2_client, user_account):
+    settings.ACCOUNT_MAX_IN_FLIGHT_REQUESTS = {'transfer': 0}
+    response = transfer_to_account(user_2_client, user_account)
+
+    assert response.status_code == HTTP_503_SERVICE_UNAVAILABLE
+    assert response['Retry-After'] == '1'
+    assert not AccountHistory.objects.count()
+
+
+def test_metrics_count_admitted_and_shed_load(db, user_2_client, user_account):
+    admin = User.objects.create_superuser('admin')
+    with patch.object(UserTransferThrottle, 'rate', '1/min', create=True):
+        transfer_to_account(user_2_client, user_account)
+        transfer_to_account(user_2_client, user_account)
+    user_2_client.force_authenticate(admin)
+    response = user_2_client.get(reverse('metrics'))
+
+    assert response.status_code == HTTP_200_OK
+    response = response.json()
+    assert response['throttle.transfer_user.admitted'] == 1
+    assert response['throttle.transfer_user.shed'] == 1
+    assert response['concurrency.transfer.admitted'] == 1
+    assert response['concurrency.transfer.shed'] == 0
+
+
+def test_metrics_require_admin(db, user_client):
+    response = user_client.get(reverse('metrics'))
+
+    assert response.status_code == HTTP_403_FORBIDDEN
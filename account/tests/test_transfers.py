@@ -0,0 +1,163 @@
+import queue
+import threading
+from unittest.mock import patch
+
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from account.models import Account, AccountHistory, MonthlyTotal
+from account.transfers import (
+    InsufficientFunds,
+    Transfer,
+    TransferBatcher,
+    TransferTimeout,
+    apply_transfers,
+    make_transfer,
+)
+
+
+def test_apply_transfers(db, user_account, user_account_2):
+    transfers = [
+        Transfer(account_id=user_account.id, amount=100.00, description='Salary', type='I'),
+        Transfer(account_id=user_account_2.id, amount=10.00, description='Rent', type='O'),
+        Transfer(account_id=user_account.id, amount=30.00, description='Groceries', type='O'),
+        Transfer(account_id=user_account.id, amount=20.00, description='Refund', type='I'),
+    ]
+
+    with CaptureQueriesContext(connection) as context:
+        results = apply_transfers(transfers)
+
+    # Balances and history of all transfers are written with a single statement each.
+    statements = [query['sql'].split(' ')[:3] for query in context.captured_queries]
+    assert statements.count(['UPDATE', '"account_account"', 'SET']) == 1
+    assert statements.count(['INSERT', 'INTO', '"account_accounthistory"']) == 1
+
+    assert isinstance(results[1], InsufficientFunds)
+    assert [result.balance_after_transfer for result in results if isinstance(result, AccountHistory)] == [
+        100.00, 70.00, 90.00,
+    ]
+    user_account.refresh_from_db()
+    assert (user_account.balance, user_account.version) == (90.00, 3)
+    assert AccountHistory.objects.filter(account=user_account).count() == 3
+    assert not AccountHistory.objects.filter(account=user_account_2).exists()
+    assert set(MonthlyTotal.objects.values_list('type', 'total', 'count')) == {('I', 120.00, 2), ('O', 30.00, 1)}
+
+
+def test_apply_transfers_to_missing_account(db):
+    result, = apply_transfers([Transfer(account_id=0, amount=10.00, description=None, type='I')])
+
+    assert isinstance(result, Account.DoesNotExist)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_apply_transfers_ignores_hook_errors_after_commit(user_account):
+    def publish_transfer(account, account_history_data):
+        transaction.on_commit(lambda: 1 / 0)
+
+    transfer = Transfer(account_id=user_account.id, amount=10.00, description=None, type='I')
+    with patch('account.transfers.publish_transfer', publish_transfer):
+        result, = apply_transfers([transfer])
+
+    assert result.balance_after_transfer == 10.00
+    user_account.refresh_from_db()
+    assert user_account.balance == 10.00
+
+
+def recording_batcher(**kwargs):
+    batches = []
+
+    def apply(batch):
+        batches.append(len(batch))
+        return [InsufficientFunds() if transfer.amount < 0 else transfer.amount for transfer in batch]
+
+    return TransferBatcher(apply=apply, **kwargs), batches
+
+
+def submit_concurrently(batcher, amounts):
+    futures = [None] * len(amounts)
+    barrier = threading.Barrier(len(amounts))
+
+    def submit(index, amount):
+        barrier.wait()
+        futures[index] = batcher.submit(Transfer(account_id=1, amount=amount, description=None, type='I'))
+
+    threads = [threading.Thread(target=submit, args=item) for item in enumerate(amounts)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return futures
+
+
+def test_batcher_groups_concurrent_transfers():
+    batcher, batches = recording_batcher(window=0.2, max_batch_size=100)
+
+    futures = submit_concurrently(batcher, [1.0, 2.0, -1.0, 3.0])
+
+    assert [future.result(1) for future in (futures[0], futures[1], futures[3])] == [1.0, 2.0, 3.0]
+    with pytest.raises(InsufficientFunds):
+        futures[2].result(1)
+    assert batches == [4]
+
+
+def test_batcher_limits_batch_size():
+    batcher, batches = recording_batcher(window=0.2, max_batch_size=2)
+
+    futures = submit_concurrently(batcher, [1.0, 2.0, 3.0])
+
+    assert sorted(future.result(2) for future in futures) == [1.0, 2.0, 3.0]
+    assert sorted(batches) == [1, 2]
+
+
+def test_batcher_isolates_failing_transfer():
+    batches = []
+
+    def apply(batch):
+        batches.append(len(batch))
+        if any(transfer.description == 'x' * 129 for transfer in batch):
+            raise ValueError('value too long')
+        return [transfer.amount for transfer in batch]
+
+    batcher = TransferBatcher(window=0.2, max_batch_size=100, apply=apply)
+    futures = [None] * 3
+    barrier = threading.Barrier(3)
+
+    def submit(index, description):
+        barrier.wait()
+        futures[index] = batcher.submit(Transfer(account_id=1, amount=index, description=description, type='I'))
+
+    threads = [threading.Thread(target=submit, args=item) for item in enumerate(['a', 'x' * 129, 'b'])]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert futures[0].result(1) == 0
+    assert futures[2].result(1) == 2
+    with pytest.raises(ValueError):
+        futures[1].result(1)
+    assert batches == [3, 1, 1, 1]
+
+
+def test_batcher_survives_metrics_errors():
+    batcher, _ = recording_batcher(window=0, max_batch_size=100)
+
+    with patch('account.transfers.metrics.increment', side_effect=ConnectionError):
+        assert batcher.submit(Transfer(account_id=1, amount=1.0, description=None, type='I')).result(1) == 1.0
+
+    assert batcher.submit(Transfer(account_id=1, amount=2.0, description=None, type='I')).result(1) == 2.0
+
+
+def test_make_transfer_timeout(db, settings, user_account):
+    settings.ACCOUNT_TRANSFER_GROUP_COMMIT = True
+    settings.ACCOUNT_TRANSFER_TIMEOUT_SECONDS = 0.1
+    # A batcher whose thread is stuck never picks the transfer up, which is then cancelled.
+    batcher = TransferBatcher.__new__(TransferBatcher)
+    batcher._queue = queue.SimpleQueue()
+    transfer = Transfer(account_id=user_account.id, amount=10.00, description=None, type='I')
+
+    with patch('account.transfers.get_batcher', return_value=batcher), pytest.raises(TransferTimeout):
+        make_transfer(transfer)
+
+    assert transfer.future.cancelled()
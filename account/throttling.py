@@ -0,0 +1,142 @@
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.connection import ConnectionProxy
+from rest_framework.response import Response
+from rest_framework.status import HTTP_503_SERVICE_UNAVAILABLE
+from rest_framework.throttling import SimpleRateThrottle
+
+from account import metrics
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token bucket holding `num_requests` tokens, refilled at `num_requests` per `duration`.
+
+    Unlike the sliding window of `SimpleRateThrottle`, the bucket state is a single `(tokens, timestamp)` pair, so the
+    cached value stays constant in size whatever the rate is.
+    """
+    cache = ConnectionProxy(caches, settings.ACCOUNT_THROTTLE_CACHE)
+    # Requests failing to lock the bucket within about this many milliseconds are throttled.
+    lock_attempts = 50
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        metrics.register(f'throttle.{cls.scope}.admitted', f'throttle.{cls.scope}.shed')
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        # `add` is atomic in every cache backend, so concurrent requests update the bucket one at a time. The lock
+        # expires on its own if its holder dies.
+        lock_key = f'{self.key}_lock'
+        for _ in range(self.lock_attempts):
+            if self.cache.add(lock_key, True, timeout=1):
+                break
+            time.sleep(0.001)
+        else:
+            self.wait_seconds = 1
+            metrics.increment(f'throttle.{self.scope}.shed')
+            return False
+
+        try:
+            now = self.timer()
+            tokens, updated_at = self.cache.get(self.key, (self.num_requests, now))
+            tokens = min(self.num_requests, tokens + (now - updated_at) * self.num_requests / self.duration)
+            if tokens < 1:
+                self.wait_seconds = (1 - tokens) * self.duration / self.num_requests
+                metrics.increment(f'throttle.{self.scope}.shed')
+                return False
+
+            self.cache.set(self.key, (tokens - 1, now), self.duration)
+        finally:
+            self.cache.delete(lock_key)
+        metrics.increment(f'throttle.{self.scope}.admitted')
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class UserTransferThrottle(TokenBucketThrottle):
+    scope = 'transfer_user'
+
+    def get_cache_key(self, request, view):
+        if not request.user.is_authenticated:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': request.user.pk}
+
+
+class AccountTransferThrottle(TokenBucketThrottle):
+    """
+    Bucket of an account, shared by transfers to and from it. Transfers name accounts by id or by number, so views
+    check it with `check_account_throttle` once they have found the account.
+    """
+    scope = 'transfer_account'
+
+    def __init__(self, account_id):
+        super().__init__()
+        self.account_id = account_id
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.account_id}
+
+
+def check_account_throttle(view, request, account_id):
+    throttle = AccountTransferThrottle(account_id)
+    if not throttle.allow_request(request, view):
+        view.throttled(request, throttle.wait())
+
+
+def limit_concurrency(scope: str):
+    """
+    Sheds requests with 503 once `ACCOUNT_MAX_IN_FLIGHT_REQUESTS[scope]` requests are being processed by all workers
+    sharing the throttle cache.
+    """
+    metrics.register(f'concurrency.{scope}.admitted', f'concurrency.{scope}.shed')
+
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            cache = ConnectionProxy(caches, settings.ACCOUNT_THROTTLE_CACHE)
+            key = f'in_flight_{scope}'
+            # The counter expires once no request has started or finished for the timeout, so that slots leaked by
+            # killed workers are eventually given back.
+            timeout = settings.ACCOUNT_IN_FLIGHT_COUNTER_TIMEOUT
+            cache.add(key, 0, timeout=timeout)
+            try:
+                in_flight = cache.incr(key)
+            except ValueError:
+                cache.add(key, 1, timeout=timeout)
+                in_flight = 1
+            cache.touch(key, timeout)
+
+            try:
+                if in_flight > settings.ACCOUNT_MAX_IN_FLIGHT_REQUESTS[scope]:
+                    metrics.increment(f'concurrency.{scope}.shed')
+                    return Response(
+                        {'message': 'Service is overloaded, try again later'},
+                        status=HTTP_503_SERVICE_UNAVAILABLE,
+                        headers={'Retry-After': '1'},
+                    )
+                metrics.increment(f'concurrency.{scope}.admitted')
+                return view_method(self, request, *args, **kwargs)
+            finally:
+                try:
+                    if cache.decr(key) < 0:
+                        # The counter expired while the request was in flight, its slot was given back already.
+                        cache.incr(key)
+                    cache.touch(key, timeout)
+                except ValueError:
+                    pass
+
+        return wrapper
+
+    return decorator
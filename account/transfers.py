@@ -0,0 +1,224 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from account import metrics
+from account.analytics import add_to_monthly_totals
+from account.events import publish_transfer, transfer_event
+from account.fx import UnsupportedCurrency, fx_rates
+from account.models import Account, AccountHistory, OutboxEvent
+from account.serializers import AccountHistorySerializer
+
+logger = logging.getLogger(__name__)
+
+metrics.register('transfer_batches', 'transfer_batched_transfers')
+
+
+class InsufficientFunds(Exception):
+    pass
+
+
+class TransferTimeout(Exception):
+    """The transfer was not picked up by the group commit thread in time and will not be applied."""
+
+
+@dataclass
+class Transfer:
+    account_id: int
+    amount: float
+    description: str | None
+    type: str
+    # The currency of the account if not given.
+    currency: str | None = None
+    future: Future = field(default_factory=Future, compare=False, repr=False)
+
+
+@contextmanager
+def _transfer_transaction():
+    """
+    Atomic block whose on-commit hooks cannot fail the transfers: once they are committed, callers must neither retry
+    them nor report them as failed, so errors of later hooks are only logged.
+    """
+    committed = []
+    try:
+        with transaction.atomic():
+            # Registered first, so it runs before any other hook.
+            transaction.on_commit(lambda: committed.append(True))
+            yield
+    except Exception:
+        if not committed:
+            raise
+        logger.exception('An on-commit hook failed after transfers were committed')
+
+
+def apply_transfers(transfers: list[Transfer]) -> list[AccountHistory | Exception]:
+    """
+    Applies transfers in a single transaction with multi-row statements, returns the history record or the error of
+    every transfer. Transfers are applied in order, so an outgoing transfer may be covered by an earlier incoming one.
+    """
+    with _transfer_transaction():
+        # Accounts are locked in the order of their ids, so that concurrent batches cannot deadlock.
+        accounts = Account.objects.select_for_update().filter(id__in={t.account_id for t in transfers}).order_by('id')
+        accounts = {account.id: account for account in accounts}
+        # All transfers of a batch are converted with the same version of rates.
+        rate_table = None
+        results = []
+        versions = []
+        for transfer in transfers:
+            account = accounts.get(transfer.account_id)
+            if account is None:
+                results.append(Account.DoesNotExist())
+                continue
+            amount, exchange_rate = transfer.amount, None
+            if transfer.currency and transfer.currency != account.currency:
+                rate_table = rate_table or fx_rates.table
+                try:
+                    exchange_rate = rate_table.rate(transfer.currency, account.currency)
+                except UnsupportedCurrency as error:
+                    results.append(error)
+                    continue
+                amount = round(transfer.amount * exchange_rate, 2)
+            if transfer.type == 'O' and (account.balance <= 0 or amount > account.balance):
+                results.append(InsufficientFunds())
+                continue
+            account.balance += amount if transfer.type == 'I' else -amount
+            account.version += 1
+            versions.append(account.version)
+            results.append(AccountHistory(
+                account=account,
+                amount=amount,
+                balance_after_transfer=account.balance,
+                currency=account.currency,
+                exchange_rate=exchange_rate,
+                original_amount=None if exchange_rate is None else transfer.amount,
+                original_currency=None if exchange_rate is None else transfer.currency,
+                description=transfer.description,
+                type=transfer.type,
+            ))
+
+        account_history_records = [result for result in results if isinstance(result, AccountHistory)]
+        Account.objects.bulk_update(
+            {record.account_id: record.account for record in account_history_records}.values(),
+            ['balance', 'version'],
+        )
+        AccountHistory.objects.bulk_create(account_history_records)
+        add_to_monthly_totals(account_history_records)
+        outbox_events = []
+        for record, version in zip(account_history_records, versions):
+            # Every event carries the balance and version right after its own transfer.
+            account = Account(id=record.account_id, balance=record.balance_after_transfer, version=version)
+            account_history_data = AccountHistorySerializer(record).data
+            publish_transfer(account, account_history_data)
+            outbox_events.append(OutboxEvent(topic='transfer', payload=transfer_event(account, account_history_data)))
+        OutboxEvent.objects.bulk_create(outbox_events)
+    return results
+
+
+class TransferBatcher:
+    """
+    Group commit of transfers: transfers submitted by concurrent requests within `window` seconds of the first one
+    are applied by a background thread in a single transaction of at most `max_batch_size` transfers.
+    """
+
+    def __init__(self, window: float, max_batch_size: int, apply=apply_transfers):
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._apply = apply
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name='transfer-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, transfer: Transfer) -> Future:
+        self._queue.put(transfer)
+        return transfer.future
+
+    def _collect(self) -> list[Transfer]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            # Transfers given up by their callers are skipped, the others cannot be cancelled from now on.
+            batch = [transfer for transfer in self._collect() if transfer.future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                self._apply_batch(batch)
+            except Exception as error:
+                # The thread must keep running and every caller must get an outcome, whatever went wrong.
+                for transfer in batch:
+                    if not transfer.future.done():
+                        transfer.future.set_exception(error)
+
+    def _apply_batch(self, batch: list[Transfer]):
+        close_old_connections()
+        try:
+            results = self._apply(batch)
+        except Exception as error:
+            if len(batch) == 1:
+                results = [error]
+            else:
+                # A statement failed for one of the transfers, which must not fail the others. Nothing has been
+                # committed, errors raised after the commit are not propagated by `apply_transfers`.
+                results = [self._apply_one(transfer) for transfer in batch]
+        for transfer, result in zip(batch, results):
+            if isinstance(result, Exception):
+                transfer.future.set_exception(result)
+            else:
+                transfer.future.set_result(result)
+        metrics.increment('transfer_batches')
+        metrics.increment('transfer_batched_transfers', len(batch))
+
+    def _apply_one(self, transfer: Transfer) -> AccountHistory | Exception:
+        try:
+            return self._apply([transfer])[0]
+        except Exception as error:
+            return error
+
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+def get_batcher() -> TransferBatcher:
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = TransferBatcher(
+                settings.ACCOUNT_TRANSFER_BATCH_WINDOW_MILLISECONDS / 1000,
+                settings.ACCOUNT_TRANSFER_MAX_BATCH_SIZE,
+            )
+        return _batcher
+
+
+def make_transfer(transfer: Transfer) -> AccountHistory:
+    """Applies a transfer, sharing a transaction with concurrent ones in the group commit mode."""
+    if not settings.ACCOUNT_TRANSFER_GROUP_COMMIT:
+        result, = apply_transfers([transfer])
+        if isinstance(result, Exception):
+            raise result
+        return result
+    future = get_batcher().submit(transfer)
+    try:
+        return future.result(settings.ACCOUNT_TRANSFER_TIMEOUT_SECONDS)
+    except FutureTimeoutError:
+        if future.cancel():
+            raise TransferTimeout()
+    # The transfer is being applied already, its transaction decides the outcome.
+    return future.result()
@@ -1,8 +1,12 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 
-from .views import AccountViewSet
+from .views import AccountViewSet, MetricsView, ScheduledTransferViewSet
 
 router = DefaultRouter()
 router.register(r'accounts', AccountViewSet, basename='account')
+router.register(r'scheduled-transfers', ScheduledTransferViewSet, basename='scheduled-transfer')
 
-urlpatterns = router.urls
+urlpatterns = router.urls + [
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+]
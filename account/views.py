@@ -1,13 +1,64 @@
+import datetime
+import hashlib
+
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.http import parse_etags
+from rest_framework import mixins
 from rest_framework.decorators import action
 from rest_framework.generics import get_object_or_404
 from rest_framework.pagination import PageNumberPagination
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
-from rest_framework.status import HTTP_204_NO_CONTENT, HTTP_400_BAD_REQUEST, HTTP_404_NOT_FOUND
-from rest_framework.viewsets import ModelViewSet
+from rest_framework.status import (
+    HTTP_204_NO_CONTENT,
+    HTTP_304_NOT_MODIFIED,
+    HTTP_400_BAD_REQUEST,
+    HTTP_404_NOT_FOUND,
+    HTTP_501_NOT_IMPLEMENTED,
+    HTTP_503_SERVICE_UNAVAILABLE,
+)
+from rest_framework.views import APIView
+from rest_framework.viewsets import GenericViewSet, ModelViewSet
+
+from account import metrics, outbox
+from account.account_number_filter import account_number_filter, false_positive_rate, legacy_account_numbers
+from account.analytics import month_of
+from account.events import stream_account_events
+from account.fx import UnsupportedCurrency, fx_rates
+from account.history import account_history_timeline, search_account_history
+from account.models import Account, AccountHistory, MonthlyTotal, ScheduledTransfer, is_well_formed_account_number
+from account.renderers import EventStreamRenderer
+from account.routers import pin_to_primary, read_from_replica
+from account.serializers import (
+    AccountAnalyticsSerializer,
+    AccountSerializer,
+    AccountHistorySearchSerializer,
+    AccountHistorySerializer,
+    ScheduledTransferSerializer,
+)
+from account.throttling import UserTransferThrottle, check_account_throttle, limit_concurrency
+from account.transfers import InsufficientFunds, Transfer, TransferTimeout, make_transfer
+
+
+def _account_etag(account_id, version):
+    return f'W/"{account_id}-{version}"'
+
+
+def _digest_etag(account_id, *parts):
+    return f'W/"{account_id}-{hashlib.sha256(repr(parts).encode()).hexdigest()[:32]}"'
 
-from account.models import Account, AccountHistory
-from account.serializers import AccountSerializer, AccountHistorySerializer
+
+def _etag_headers(etag):
+    # Every representation has the same ETag, so caches must keep them apart by the negotiated media type.
+    return {'ETag': etag, 'Vary': 'Accept'}
+
+
+def _etag_matches(request, etag):
+    etags = parse_etags(request.headers.get('If-None-Match', ''))
+    return '*' in etags or etag.removeprefix('W/') in (tag.removeprefix('W/') for tag in etags)
 
 
 class AccountViewSet(ModelViewSet):
@@ -25,58 +76,222 @@ class AccountViewSet(ModelViewSet):
     def retrieve(self, request, *args, **kwargs):
         return Response(status=HTTP_404_NOT_FOUND)
 
-    @action(detail=False, methods=['patch'])
+    @action(detail=False, methods=['patch'], throttle_classes=[UserTransferThrottle])
+    @limit_concurrency('transfer')
     def transfer_to_account(self, request):
-        account = get_object_or_404(Account, account_number=request.data['account_number'])
+        account_number = request.data['account_number']
+        if not is_well_formed_account_number(account_number) or not legacy_account_numbers.might_exist(account_number):
+            return Response({'message': 'Invalid account number'}, status=HTTP_404_NOT_FOUND)
+        if not account_number_filter.might_exist(account_number):
+            return Response(status=HTTP_404_NOT_FOUND)
+        account = Account.objects.filter(account_number=account_number).first()
+        if account is None:
+            account_number_filter.record_miss(account_number)
+            return Response(status=HTTP_404_NOT_FOUND)
+        check_account_throttle(self, request, account.id)
         if request.data['amount'] < 0:
             return Response({'message': 'Negative amount is not allowed'}, status=HTTP_400_BAD_REQUEST)
-        account.balance += request.data['amount']
-        account.save()
-        AccountHistory.objects.create(
-            account=account,
-            amount=request.data['amount'],
-            balance_after_transfer=account.balance,
-            description=request.data['description'],
-            type='I'
-        )
+        currency = str(request.data.get('currency', account.currency)).upper()
+        if currency != account.currency and not fx_rates.is_supported(currency):
+            return Response({'message': 'Unsupported currency'}, status=HTTP_400_BAD_REQUEST)
+        try:
+            make_transfer(Transfer(
+                account_id=account.id,
+                amount=request.data['amount'],
+                description=request.data['description'],
+                type='I',
+                currency=currency,
+            ))
+        except UnsupportedCurrency:
+            return Response({'message': 'Unsupported currency'}, status=HTTP_400_BAD_REQUEST)
+        except TransferTimeout:
+            return Response({'message': 'The transfer was not made, try again later'},
+                            status=HTTP_503_SERVICE_UNAVAILABLE)
+        pin_to_primary(request.user)
         return Response(status=HTTP_204_NO_CONTENT)
 
-    @action(detail=True, methods=['patch'])
+    @action(detail=True, methods=['patch'], throttle_classes=[UserTransferThrottle])
+    @limit_concurrency('transfer')
     def transfer_from_account(self, request, pk=None):
         account = get_object_or_404(Account, id=pk)
         if account.owner != request.user:
             return Response(status=HTTP_404_NOT_FOUND)
-        if account.balance <= 0 or request.data['amount'] > account.balance:
+        check_account_throttle(self, request, account.id)
+        currency = str(request.data.get('currency', account.currency)).upper()
+        amount = request.data['amount']
+        if currency != account.currency:
+            try:
+                amount = fx_rates.convert(amount, currency, account.currency)
+            except UnsupportedCurrency:
+                return Response({'message': 'Unsupported currency'}, status=HTTP_400_BAD_REQUEST)
+        if account.balance <= 0 or amount > account.balance:
             return Response({'message': 'You do not have enough funds in your account'}, status=HTTP_400_BAD_REQUEST)
         if request.data['amount'] < 0:
             return Response({'message': 'Negative amount is not allowed'}, status=HTTP_400_BAD_REQUEST)
-        account.balance -= request.data['amount']
-        account.save()
-        AccountHistory.objects.create(
-            account=account,
-            amount=request.data['amount'],
-            balance_after_transfer=account.balance,
-            description=request.data['description'],
-            type='O'
-        )
+        try:
+            make_transfer(Transfer(
+                account_id=account.id,
+                amount=request.data['amount'],
+                description=request.data['description'],
+                type='O',
+                currency=currency,
+            ))
+        except InsufficientFunds:
+            return Response({'message': 'You do not have enough funds in your account'}, status=HTTP_400_BAD_REQUEST)
+        except UnsupportedCurrency:
+            return Response({'message': 'Unsupported currency'}, status=HTTP_400_BAD_REQUEST)
+        except TransferTimeout:
+            return Response({'message': 'The transfer was not made, try again later'},
+                            status=HTTP_503_SERVICE_UNAVAILABLE)
+        pin_to_primary(request.user)
         return Response(status=HTTP_204_NO_CONTENT)
 
+    def _get_owned_account_values(self, request, pk, *fields):
+        try:
+            account = Account.objects.filter(id=pk).values('owner_id', 'version', *fields).first()
+        except (TypeError, ValueError):
+            return None
+        if account is None or account['owner_id'] != request.user.id:
+            return None
+        return account
+
     @action(detail=True, methods=['get'])
+    @read_from_replica
     def check_balance(self, request, pk=None):
-        account = get_object_or_404(Account, id=pk)
-        if account.owner != request.user:
+        account = self._get_owned_account_values(request, pk, 'balance')
+        if account is None:
             return Response(status=HTTP_404_NOT_FOUND)
-        return Response({'balance': account.balance})
+        etag = _account_etag(pk, account['version'])
+        if _etag_matches(request, etag):
+            return Response(status=HTTP_304_NOT_MODIFIED, headers=_etag_headers(etag))
+        return Response({'balance': account['balance']}, headers=_etag_headers(etag))
 
     @action(detail=True, methods=['get'])
+    @read_from_replica
     def check_history(self, request, pk=None):
-        account = get_object_or_404(Account, id=pk)
-        if account.owner != request.user:
+        account = self._get_owned_account_values(request, pk)
+        if account is None:
             return Response(status=HTTP_404_NOT_FOUND)
+        etag = _account_etag(pk, account['version'])
+        if _etag_matches(request, etag):
+            return Response(status=HTTP_304_NOT_MODIFIED, headers=_etag_headers(etag))
 
         paginator = PageNumberPagination()
-        account_history = AccountHistory.objects.filter(account=account).order_by('-transaction_date')
-        result_page = paginator.paginate_queryset(account_history, request)
+        result_page = paginator.paginate_queryset(account_history_timeline(pk), request)
+        serializer = AccountHistorySerializer(result_page, many=True)
+
+        response = paginator.get_paginated_response(serializer.data)
+        for header, value in _etag_headers(etag).items():
+            response[header] = value
+        return response
+
+    @action(detail=True, methods=['get'])
+    @read_from_replica
+    def search_history(self, request, pk=None):
+        account = self._get_owned_account_values(request, pk)
+        if account is None:
+            return Response(status=HTTP_404_NOT_FOUND)
+        filters = AccountHistorySearchSerializer(data=request.query_params)
+        if not filters.is_valid():
+            return Response(filters.errors, status=HTTP_400_BAD_REQUEST)
+
+        paginator = PageNumberPagination()
+        result_page = paginator.paginate_queryset(search_account_history(pk, **filters.validated_data), request)
         serializer = AccountHistorySerializer(result_page, many=True)
 
         return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['get'])
+    @read_from_replica
+    def analytics(self, request, pk=None):
+        account = self._get_owned_account_values(request, pk, 'currency')
+        if account is None:
+            return Response(status=HTTP_404_NOT_FOUND)
+        params = AccountAnalyticsSerializer(data=request.query_params)
+        if not params.is_valid():
+            return Response(params.errors, status=HTTP_400_BAD_REQUEST)
+        first_month = month_of(timezone.now())
+        for _ in range(params.validated_data['months'] - 1):
+            first_month = (first_month - datetime.timedelta(days=1)).replace(day=1)
+        monthly_totals = MonthlyTotal.objects.filter(account_id=pk, month__gte=first_month).order_by('month', 'type')
+        monthly_totals = list(monthly_totals.values('month', 'type', 'total', 'count'))
+
+        currency = params.validated_data.get('currency', account['currency'])
+        # Converted totals change with the rates, which are read once so that the ETag matches the totals returned.
+        rate_table = fx_rates.table if currency != account['currency'] else None
+
+        # Rollups rewrite totals without a new version of the account, so the totals read are part of the ETag too.
+        etag = _digest_etag(
+            pk,
+            account['version'],
+            first_month,
+            params.validated_data['months'],
+            monthly_totals,
+            currency,
+            rate_table and rate_table.version,
+        )
+        if _etag_matches(request, etag):
+            return Response(status=HTTP_304_NOT_MODIFIED, headers=_etag_headers(etag))
+
+        totals = [monthly_total['total'] for monthly_total in monthly_totals]
+        if rate_table is not None:
+            totals = rate_table.convert_many(totals, [account['currency']] * len(totals), currency)
+
+        months = {}
+        for monthly_total, total in zip(monthly_totals, totals):
+            month = months.setdefault(monthly_total['month'], {
+                'month': monthly_total['month'].strftime('%Y-%m'),
+                'incoming': 0,
+                'incoming_count': 0,
+                'outgoing': 0,
+                'outgoing_count': 0,
+            })
+            type_name = dict(AccountHistory.TYPE)[monthly_total['type']]
+            month[type_name] = total
+            month[f'{type_name}_count'] = monthly_total['count']
+        return Response({'currency': currency, 'months': list(months.values())}, headers=_etag_headers(etag))
+
+    @action(detail=True, methods=['get'], renderer_classes=[JSONRenderer, EventStreamRenderer])
+    def events(self, request, pk=None):
+        account = self._get_owned_account_values(request, pk)
+        if account is None:
+            return Response(status=HTTP_404_NOT_FOUND)
+        if not isinstance(request._request, ASGIRequest):
+            return Response({'message': 'Event streams are only served by the ASGI application'},
+                            status=HTTP_501_NOT_IMPLEMENTED)
+
+        response = StreamingHttpResponse(stream_account_events(int(pk)), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
+class ScheduledTransferViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    GenericViewSet,
+):
+    permission_classes = (IsAuthenticated,)
+    serializer_class = ScheduledTransferSerializer
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            return ScheduledTransfer.objects.none()
+        return ScheduledTransfer.objects.filter(account__owner=self.request.user, active=True).order_by('id')
+
+    def perform_destroy(self, instance):
+        # Runs are kept as a record of executed transfers.
+        instance.active = False
+        instance.save(update_fields=['active'])
+
+
+class MetricsView(APIView):
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        snapshot = metrics.snapshot()
+        snapshot['account_number_filter.false_positive_rate'] = false_positive_rate(snapshot)
+        snapshot['outbox.lag_seconds'] = outbox.lag_seconds()
+        return Response(snapshot)
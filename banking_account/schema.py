@@ -0,0 +1,41 @@
+import hashlib
+from functools import cache
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_safe
+
+
+def write_schema(path: Path) -> bytes:
+    from banking_account.swagger import generate_schema
+
+    schema = generate_schema()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = path.with_suffix(f'{path.suffix}.tmp')
+    temporary_path.write_bytes(schema)
+    temporary_path.replace(path)
+    return schema
+
+
+@cache
+def load_schema(path: Path) -> tuple[bytes, str]:
+    """Returns the precomputed OpenAPI document and its ETag, the document is generated if it does not exist yet."""
+    try:
+        schema = path.read_bytes()
+    except FileNotFoundError:
+        schema = write_schema(path)
+    return schema, hashlib.sha256(schema).hexdigest()[:32]
+
+
+def _schema_etag(request) -> str:
+    return load_schema(Path(settings.OPENAPI_SCHEMA_PATH))[1]
+
+
+@require_safe
+@cache_control(public=True, max_age=60 * 60)
+@condition(etag_func=_schema_etag)
+def schema_json(request):
+    schema, _ = load_schema(Path(settings.OPENAPI_SCHEMA_PATH))
+    return HttpResponse(schema, content_type='application/json')
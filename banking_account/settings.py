@@ -93,6 +93,40 @@ DATABASES = {
     }
 }
 
+# Read-only endpoints are served by replicas listed in `DB_REPLICA_HOSTS` (comma separated), see
+# `account.routers.ReplicaRouter`. A user is kept on the primary for `REPLICA_PIN_SECONDS` after a transfer.
+
+REPLICA_DATABASES = []
+for replica_index, replica_host in enumerate(filter(None, os.getenv('DB_REPLICA_HOSTS', default='').split(','))):
+    DATABASES[f'replica_{replica_index}'] = {
+        **DATABASES['default'],
+        'HOST': replica_host,
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASES.append(f'replica_{replica_index}')
+
+DATABASE_ROUTERS = ['account.routers.ReplicaRouter']
+REPLICA_PIN_CACHE = 'default'
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', default=5))
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+# Throttling counters and replica pins are shared by all workers using the same cache. The local memory defaults keep
+# them per worker, point `CACHE_BACKEND` and `THROTTLE_CACHE_BACKEND` at a shared backend (e.g. memcached or redis) to
+# share them.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', default=''),
+    },
+    'throttle': {
+        'BACKEND': os.getenv('THROTTLE_CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('THROTTLE_CACHE_LOCATION', default='throttle'),
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
@@ -140,5 +174,81 @@ REST_FRAMEWORK = {
         'rest_framework.authentication.BasicAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'account.parsers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+        'account.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'transfer_user': os.getenv('THROTTLE_TRANSFER_USER_RATE', default='60/min'),
+        'transfer_account': os.getenv('THROTTLE_TRANSFER_ACCOUNT_RATE', default='120/min'),
+    },
     'PAGE_SIZE': 10
 }
+
+# Server-sent events pushed by the `events` endpoint. The local backend only fans out within a single worker, use
+# `account.events.PostgresEventBackend` to deliver events across workers through LISTEN/NOTIFY.
+ACCOUNT_EVENTS_BACKEND = os.getenv('ACCOUNT_EVENTS_BACKEND', default='account.events.LocalEventBackend')
+ACCOUNT_EVENTS_QUEUE_SIZE = 100
+ACCOUNT_EVENTS_KEEPALIVE_SECONDS = 15
+ACCOUNT_EVENTS_MAX_STREAM_SECONDS = 300
+ACCOUNT_EVENTS_RETRY_MILLISECONDS = 3000
+
+# OpenAPI document served at `/swagger.json`. It is generated by the `generate_openapi_schema` command or, if missing,
+# on the first request.
+OPENAPI_SCHEMA_PATH = os.getenv('OPENAPI_SCHEMA_PATH', default=BASE_DIR / 'openapi.json')
+
+SWAGGER_SETTINGS = {
+    'SPEC_URL': 'schema-json',
+}
+
+# Admission control of transfer endpoints, see `account.throttling`.
+ACCOUNT_THROTTLE_CACHE = 'throttle'
+ACCOUNT_MAX_IN_FLIGHT_REQUESTS = {
+    'transfer': int(os.getenv('MAX_IN_FLIGHT_TRANSFERS', default=50)),
+}
+ACCOUNT_IN_FLIGHT_COUNTER_TIMEOUT = 60
+ACCOUNT_METRICS_CACHE = 'throttle'
+
+# Output of the `generate_statements` command.
+STATEMENTS_DIR = os.getenv('STATEMENTS_DIR', default=BASE_DIR / 'statements')
+
+# History older than this is moved to the archive by the `archive_history` command.
+HISTORY_HOT_DAYS = int(os.getenv('HISTORY_HOT_DAYS', default=365))
+
+# Group commit of transfers, see `account.transfers.TransferBatcher`. Transfers submitted by concurrent requests of a
+# worker within the window share one transaction, which only pays off with threaded or asynchronous workers.
+ACCOUNT_TRANSFER_GROUP_COMMIT = os.getenv('TRANSFER_GROUP_COMMIT', default='') == '1'
+ACCOUNT_TRANSFER_BATCH_WINDOW_MILLISECONDS = float(os.getenv('TRANSFER_BATCH_WINDOW_MILLISECONDS', default=2))
+ACCOUNT_TRANSFER_MAX_BATCH_SIZE = int(os.getenv('TRANSFER_MAX_BATCH_SIZE', default=100))
+ACCOUNT_TRANSFER_TIMEOUT_SECONDS = 10
+
+# Bloom filter answering transfers to missing account numbers without a query, see `account.account_number_filter`.
+# Workers learn about accounts created since their last rebuild from the cache, so the filter is only enabled by
+# default when the cache is shared by workers.
+ACCOUNT_NUMBER_FILTER_CACHE = 'default'
+ACCOUNT_NUMBER_FILTER = os.getenv(
+    'ACCOUNT_NUMBER_FILTER',
+    default='0' if CACHES[ACCOUNT_NUMBER_FILTER_CACHE]['BACKEND'].endswith('.LocMemCache') else '1',
+) == '1'
+ACCOUNT_NUMBER_FILTER_ERROR_RATE = 0.01
+ACCOUNT_NUMBER_FILTER_REBUILD_SECONDS = int(os.getenv('ACCOUNT_NUMBER_FILTER_REBUILD_SECONDS', default=3600))
+
+# Sink of transfer events relayed from the outbox by the `relay_outbox` command.
+ACCOUNT_OUTBOX_SINK = os.getenv('ACCOUNT_OUTBOX_SINK', default='account.outbox.NDJSONSink')
+ACCOUNT_OUTBOX_NDJSON_PATH = os.getenv('ACCOUNT_OUTBOX_NDJSON_PATH', default=BASE_DIR / 'outbox.ndjson')
+
+# Admin changelists of larger tables show the planner's row estimates instead of exact counts.
+ADMIN_EXACT_COUNT_THRESHOLD = 10000
+
+# Exchange rates of cross-currency transfers, see `account.fx`. Every row of the CSV file is the value of one unit of
+# a currency in the base currency, and changes of the file are picked up by running workers.
+FX_BASE_CURRENCY = 'PLN'
+FX_RATES_PATH = os.getenv('FX_RATES_PATH', default=BASE_DIR / 'fx_rates.csv')
+FX_RATES_CHECK_SECONDS = 5
@@ -0,0 +1,36 @@
+"""
+Settings of API-only workers.
+
+Admin, sessions and messages are not used by the API, which authenticates every request itself, so they are neither
+installed nor run as middleware, and the swagger UI is left to workers running the default settings. This saves
+middleware work per request rather than startup time: DRF itself imports `coreapi`, and with it
+`pkg_resources`, in `rest_framework.compat`, and `django.contrib.admin` through `rest_framework.schemas`, so about
+30 fewer modules are loaded and cold start is the same within noise. Select this profile with
+`DJANGO_SETTINGS_MODULE=banking_account.settings_api` and compare both with `benchmarks/bench_startup.py`.
+"""
+
+from banking_account.settings import *  # noqa: F401,F403
+from banking_account.settings import INSTALLED_APPS, MIDDLEWARE, TEMPLATES
+
+INSTALLED_APPS = [
+    app for app in INSTALLED_APPS
+    if app not in ('django.contrib.admin', 'django.contrib.messages', 'django.contrib.sessions', 'drf_yasg')
+]
+
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE
+    if middleware in ('django.middleware.security.SecurityMiddleware', 'django.middleware.common.CommonMiddleware')
+]
+
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+            ],
+        },
+    },
+]
@@ -0,0 +1,17 @@
+"""
+Settings used by the test suite.
+"""
+
+from banking_account.settings import *  # noqa: F401,F403
+
+# PBKDF2 is deliberately slow, tests do not need a secure hash.
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+]
+
+# The filter is built by a background thread, which cannot see data created inside test transactions.
+ACCOUNT_NUMBER_FILTER = False
+
+# Replica mirroring the test database, so that tests can check which alias queries run on. Queries on a mirror use
+# their own connection, so they only see committed data.
+DATABASES['replica_0'] = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}  # noqa: F405
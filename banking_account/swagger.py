@@ -0,0 +1,35 @@
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson
+from drf_yasg.generators import OpenAPISchemaGenerator
+from drf_yasg.renderers import SwaggerUIRenderer
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+from rest_framework.response import Response
+
+api_info = openapi.Info(
+   title="Snippets API",
+   default_version='v1',
+   description="Test description",
+   terms_of_service="https://www.google.com/policies/terms/",
+   contact=openapi.Contact(email="contact@snippets.local"),
+   license=openapi.License(name="BSD License"),
+)
+
+schema_view = get_schema_view(
+   api_info,
+   public=True,
+   permission_classes=[permissions.AllowAny],
+)
+
+
+class SwaggerUIView(schema_view):
+    renderer_classes = [SwaggerUIRenderer]
+
+    def get(self, request, version='', format=None):
+        # The page only needs the title and version, swagger-ui fetches the precomputed document from `SPEC_URL`.
+        return Response(openapi.Swagger(info=api_info, _prefix='/', paths=openapi.Paths({})))
+
+
+def generate_schema() -> bytes:
+    schema = OpenAPISchemaGenerator(api_info).get_schema(request=None, public=True)
+    return OpenAPICodecJson(validators=[]).encode(schema)
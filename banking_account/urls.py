@@ -13,27 +13,37 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.contrib import admin
+from functools import cache
+
+from django.conf import settings
 from django.urls import include, path, re_path
-from drf_yasg import openapi
-from drf_yasg.views import get_schema_view
-from rest_framework import permissions
-
-schema_view = get_schema_view(
-   openapi.Info(
-      title="Snippets API",
-      default_version='v1',
-      description="Test description",
-      terms_of_service="https://www.google.com/policies/terms/",
-      contact=openapi.Contact(email="contact@snippets.local"),
-      license=openapi.License(name="BSD License"),
-   ),
-   public=True,
-   permission_classes=[permissions.AllowAny],
-)
+
+from banking_account.schema import schema_json
+
+
+@cache
+def _swagger_ui_view():
+    # drf_yasg is only imported when the documentation is requested for the first time.
+    from banking_account.swagger import SwaggerUIView
+
+    return SwaggerUIView.as_view()
+
+
+def swagger_ui(request, *args, **kwargs):
+    return _swagger_ui_view()(request, *args, **kwargs)
+
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
-    re_path(r'^swagger/$', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
     path('', include('account.urls')),
 ]
+
+if 'drf_yasg' in settings.INSTALLED_APPS:
+    urlpatterns[:0] = [
+        re_path(r'^swagger/$', swagger_ui, name='schema-swagger-ui'),
+        path('swagger.json', schema_json, name='schema-json'),
+    ]
+
+if 'django.contrib.admin' in settings.INSTALLED_APPS:
+    from django.contrib import admin
+
+    urlpatterns.insert(0, path('admin/', admin.site.urls))
@@ -0,0 +1,99 @@
+"""Measures latency of looking accounts up by account number, as `transfer_to_account` does, mistyped numbers
+included.
+
+Accounts owned by a `benchmark` user are inserted first, with a single INSERT ... SELECT on Postgres. Reaching 50M
+accounts takes a while and several GB of disk, later runs reuse them.
+
+Usage: python benchmarks/bench_account_lookup.py [--accounts 50000000] [--lookups 10000]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'banking_account.settings')
+django.setup()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import connection  # noqa: E402
+
+from account.account_number_filter import legacy_account_numbers  # noqa: E402
+from account.models import Account, account_number_check_digits  # noqa: E402
+
+# Benchmark accounts have consecutive BBANs starting here, so that lookups can pick existing ones at random.
+FIRST_BBAN = 10 ** 23
+
+
+def account_number(index: int) -> str:
+    bban = str(FIRST_BBAN + index)
+    return account_number_check_digits(bban) + bban
+
+
+def populate(owner: User, accounts: int, batch_size: int = 10000):
+    existing = Account.objects.filter(owner=owner).count()
+    if existing >= accounts:
+        return
+    print(f'inserting {accounts - existing} accounts...')
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                '''
+                INSERT INTO account_account (
+                    account_number, account_name, balance, creation_date, currency, owner_id, version
+                )
+                SELECT lpad((98 - ((bban || '252100')::numeric % 97))::text, 2, '0') || bban,
+                       'Benchmark', 0, CURRENT_DATE, 'PLN', %s, 0
+                FROM (SELECT (%s + i)::text AS bban FROM generate_series(%s, %s) AS i) AS numbers
+                ''',
+                [owner.id, FIRST_BBAN, existing, accounts - 1],
+            )
+            cursor.execute('ANALYZE account_account')
+        return
+    for start in range(existing, accounts, batch_size):
+        Account.objects.bulk_create([
+            Account(account_number=account_number(index), account_name='Benchmark', owner=owner)
+            for index in range(start, min(start + batch_size, accounts))
+        ])
+
+
+def measure(numbers: list[str]) -> list[float]:
+    latencies = []
+    for number in numbers:
+        started = time.perf_counter()
+        if legacy_account_numbers.might_exist(number):
+            Account.objects.filter(account_number=number).values_list('id', flat=True).first()
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def report(name: str, latencies: list[float]):
+    latencies = sorted(latencies)
+    print(f'{name}:')
+    print(f'  median: {statistics.median(latencies) * 1e6:.0f} us')
+    print(f'  p99:    {latencies[int(len(latencies) * 0.99)] * 1e6:.0f} us')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--accounts', type=int, default=50_000_000)
+    parser.add_argument('--lookups', type=int, default=10000)
+    arguments = parser.parse_args()
+
+    owner, _ = User.objects.get_or_create(username='benchmark')
+    populate(owner, arguments.accounts)
+
+    existing = [account_number(random.randrange(arguments.accounts)) for _ in range(arguments.lookups)]
+    missing = [account_number(arguments.accounts + random.randrange(10 ** 9)) for _ in range(arguments.lookups)]
+    # One digit off, as typed by a customer.
+    mistyped = [number[:-1] + str((int(number[-1]) + 1) % 10) for number in existing]
+
+    measure(existing[:100])
+    report('existing account', measure(existing))
+    report('missing account', measure(missing))
+    report('mistyped number', measure(mistyped))
@@ -0,0 +1,78 @@
+"""Compares payload size and encode/decode time of JSON and MessagePack responses and request bodies.
+
+Usage: python benchmarks/bench_formats.py [--page-size 10 100] [--repeat 2000]
+"""
+import argparse
+import datetime
+import io
+import os
+import random
+import sys
+import timeit
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'banking_account.settings')
+django.setup()
+
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from account.parsers import MessagePackParser  # noqa: E402
+from account.renderers import MessagePackRenderer  # noqa: E402
+
+FORMATS = (
+    ('json', JSONRenderer(), JSONParser()),
+    ('msgpack', MessagePackRenderer(), MessagePackParser()),
+)
+
+
+def history_page(page_size):
+    started = datetime.datetime(2023, 4, 1)
+    balance = 1000.0
+    results = []
+    for index in range(page_size):
+        amount = round(random.uniform(1, 500), 2)
+        balance += amount
+        results.append({
+            'id': 1_000_000 + index,
+            'amount': amount,
+            'balance_after_transfer': round(balance, 2),
+            'description': random.choice(['Salary', 'Groceries', 'Electricity bill', None]),
+            'transaction_date': (started + datetime.timedelta(hours=index)).strftime('%Y-%m-%d %H:%M:%S'),
+            'type': random.choice('IO'),
+        })
+    return {
+        'count': 4321,
+        'next': 'http://api.example.com/accounts/1/check_history/?page=3',
+        'previous': None,
+        'results': results,
+    }
+
+
+def measure(name, payload, repeat):
+    print(f'{name}:')
+    for format_name, renderer, parser in FORMATS:
+        rendered = renderer.render(payload)
+        encode = timeit.timeit(lambda: renderer.render(payload), number=repeat) / repeat
+        decode = timeit.timeit(lambda: parser.parse(io.BytesIO(rendered)), number=repeat) / repeat
+        print(f'  {format_name:8} {len(rendered):7} bytes  encode {encode * 1e6:7.1f} us  decode {decode * 1e6:7.1f} us')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--page-size', type=int, nargs='+', default=[10, 100])
+    parser.add_argument('--repeat', type=int, default=2000)
+    arguments = parser.parse_args()
+
+    random.seed(0)
+    measure('transfer request', {
+        'account_number': '61109010140000071219812874',
+        'amount': 20.54,
+        'description': 'Transfer description',
+    }, arguments.repeat)
+    measure('balance response', {'balance': 1234.56}, arguments.repeat)
+    for page_size in arguments.page_size:
+        measure(f'history page of {page_size}', history_page(page_size), arguments.repeat)
@@ -0,0 +1,74 @@
+"""Measures the cost of idle server-sent event subscribers held by a single worker.
+
+Usage: python benchmarks/bench_sse_subscribers.py [--subscribers 10000] [--accounts 5000]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'banking_account.settings')
+django.setup()
+
+from account.events import Broker  # noqa: E402
+
+
+async def idle_subscriber(broker, account_id, keepalive, received):
+    subscription = broker.subscribe(account_id, queue_size=100)
+    try:
+        while True:
+            try:
+                await subscription.get(keepalive)
+            except asyncio.TimeoutError:
+                continue
+            received.append(account_id)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+async def run(subscribers, accounts, keepalive):
+    broker = Broker()
+    received = []
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    tasks = [
+        asyncio.create_task(idle_subscriber(broker, i % accounts, keepalive, received))
+        for i in range(subscribers)
+    ]
+    await asyncio.sleep(0)
+    subscribe_seconds = time.perf_counter() - started
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for account_id in range(accounts):
+        broker.publish(account_id, {'type': 'transfer'})
+    while len(received) < subscribers:
+        await asyncio.sleep(0)
+    fan_out_seconds = time.perf_counter() - started
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    print(f'subscribers:            {subscribers}')
+    print(f'subscribe time:         {subscribe_seconds * 1000:.1f} ms')
+    print(f'memory per subscriber:  {memory / subscribers / 1024:.2f} KiB')
+    print(f'fan-out to {accounts} accounts: {fan_out_seconds * 1000:.1f} ms '
+          f'({subscribers / fan_out_seconds:,.0f} deliveries/s)')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--subscribers', type=int, default=10000)
+    parser.add_argument('--accounts', type=int, default=5000)
+    parser.add_argument('--keepalive', type=float, default=15)
+    arguments = parser.parse_args()
+    asyncio.run(run(arguments.subscribers, arguments.accounts, arguments.keepalive))
@@ -0,0 +1,78 @@
+"""Measures worker cold start: import time of Django and the URLconf, and time to the first served request.
+
+Every run starts a fresh interpreter, so nothing is shared between runs.
+
+Usage: python benchmarks/bench_startup.py [--runs 10] [--settings banking_account.settings banking_account.settings_api]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+WORKER = '''
+import json
+import time
+
+started = time.perf_counter()
+import django
+from django.conf import settings
+django.setup()
+from django.core.handlers.wsgi import WSGIHandler
+from django.urls import get_resolver
+application = WSGIHandler()
+get_resolver().url_patterns
+imported = time.perf_counter()
+
+from django.test import RequestFactory
+settings.ALLOWED_HOSTS = ['*']
+# The request is rejected by authentication, so no database is needed to serve it.
+request = RequestFactory().get('/accounts/1/check_balance/')
+response = application.get_response(request)
+served = time.perf_counter()
+
+print(json.dumps({
+    'import': imported - started,
+    'first_request': served - started,
+    'status': response.status_code,
+    'modules': len(__import__('sys').modules),
+}))
+'''
+
+
+def measure(settings_module):
+    environment = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings_module, 'PYTHONPATH': str(BASE_DIR)}
+    output = subprocess.run(
+        [sys.executable, '-c', WORKER],
+        capture_output=True,
+        check=True,
+        cwd=BASE_DIR,
+        env=environment,
+        text=True,
+    )
+    return json.loads(output.stdout.splitlines()[-1])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--settings', nargs='+', default=['banking_account.settings', 'banking_account.settings_api'])
+    arguments = parser.parse_args()
+
+    results = {settings_module: [] for settings_module in arguments.settings}
+    # Profiles are measured in turns, so that drifting machine load affects all of them alike.
+    for _ in range(arguments.runs):
+        for settings_module in arguments.settings:
+            results[settings_module].append(measure(settings_module))
+
+    for settings_module, runs in results.items():
+        import_time = statistics.median(result['import'] for result in runs)
+        first_request = statistics.median(result['first_request'] for result in runs)
+        print(f'{settings_module}:')
+        print(f'  import and setup:  {import_time * 1000:.1f} ms (median of {arguments.runs})')
+        print(f'  first request:     {first_request * 1000:.1f} ms (status {runs[0]["status"]})')
+        print(f'  loaded modules:    {runs[0]["modules"]}')
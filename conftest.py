@@ -3,11 +3,27 @@ from datetime import datetime
 import pytest
 
 from django.contrib.auth.models import User
+from django.core.cache import caches
 from rest_framework.test import APIClient
 
 from account.models import Account, AccountHistory
 
 
+@pytest.fixture(scope='session')
+def django_db_setup(django_db_setup, django_db_blocker):
+    # Users are created once per test database, every test still runs in a transaction rolled back at its end.
+    with django_db_blocker.unblock():
+        for username in ('user', 'user_2'):
+            if not User.objects.filter(username=username).exists():
+                User.objects.create_user(username)
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    for cache in caches.all():
+        cache.clear()
+
+
 @pytest.fixture
 def account_history_factory(user_account):
     def factory(
@@ -69,15 +85,16 @@ def anonymous_client() -> APIClient:
     return client
 
 
+# Users are looked up with get_or_create, as transactional tests flush the users created with the test database.
 @pytest.fixture
 def user(db) -> User:
-    user = User.objects.create_user('user')
+    user, _ = User.objects.get_or_create(username='user')
     return user
 
 
 @pytest.fixture
 def user_2(db) -> User:
-    user = User.objects.create_user('user_2')
+    user, _ = User.objects.get_or_create(username='user_2')
     return user
 
 